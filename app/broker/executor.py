@@ -1,12 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import signal
 from dataclasses import dataclass
 
-from ib_insync import IB, MarketOrder, Stock
+from ib_insync import IB, MarketOrder, Stock, Trade
 from loguru import logger
 
 
+_KEEPALIVE_INTERVAL_S = 30
+
+# Process-wide IB connection handed out by get_executor(); closed by shutdown_executor().
+_shared_ib: IB | None = None
+_shared_keepalive: asyncio.Task[None] | None = None
+_connect_lock = asyncio.Lock()
+# Executors sharing one connection must not interleave placeOrder calls.
+_order_lock = asyncio.Lock()
+
+
 @dataclass(frozen=True)
 class BuyResult:
     ticker: str
@@ -38,6 +50,8 @@ class IBExecutor:
         self._port = int(port or int(os.getenv("IB_PORT", "4004")))
         self._client_id = client_id
         self._ib: IB | None = None
+        # Set by get_executor(): the connection belongs to the process, not to this executor.
+        self._shared = False
 
     @property
     def ib(self) -> IB:
@@ -53,6 +67,8 @@ class IBExecutor:
         await self.disconnect()
 
     async def connect(self) -> None:
+        if self._shared:
+            return
         trading_mode = os.getenv("TRADING_MODE", "paper")
         if trading_mode.strip().lower() != "paper":
             raise RuntimeError(f"TRADING_MODE 必须为 paper（当前={trading_mode}）")
@@ -64,17 +80,18 @@ class IBExecutor:
         logger.info("IB 连接成功")
 
     async def disconnect(self) -> None:
-        if self._ib is None:
+        # A shared connection is closed only by shutdown_executor(); other holders still use it.
+        if self._ib is None or self._shared:
             return
         try:
             self._ib.disconnect()
         finally:
             self._ib = None
 
-    async def buy_fractional_by_amount(self, ticker: str, amount_usd: float) -> BuyResult:
+    async def buy_fractional_by_amount(self, ticker: str, amount_usd: float, price: float | None = None) -> BuyResult:
         """Buy fractional shares by USD amount.
 
-        - Fetch snapshot price
+        - Fetch snapshot price (skipped when the caller passes a primed `price`)
         - qty = amount / price
         - dry_run: only log
         """
@@ -86,12 +103,13 @@ class IBExecutor:
 
         contract = Stock(ticker, "SMART", "USD")
 
-        tickers = await self._ib.reqTickersAsync(contract)
-        if not tickers:
-            raise RuntimeError("未获取到行情")
+        if price is None:
+            tickers = await self._ib.reqTickersAsync(contract)
+            if not tickers:
+                raise RuntimeError("未获取到行情")
 
-        t = tickers[0]
-        price = float(t.marketPrice()) if t.marketPrice() is not None else 0.0
+            t = tickers[0]
+            price = float(t.marketPrice()) if t.marketPrice() is not None else 0.0
         if price <= 0:
             raise RuntimeError(f"价格异常: price={price}")
 
@@ -110,10 +128,9 @@ class IBExecutor:
             return BuyResult(ticker=ticker, amount_usd=amount_usd, price=price, qty=qty, dry_run=True, order_status=None)
 
         order = MarketOrder("BUY", qty)
-        trade = self._ib.placeOrder(contract, order)
-        # Give TWS/IBG a moment to update status.
-        await self._ib.sleep(1)
-        status = getattr(trade.orderStatus, "status", None)
+        async with _order_lock:
+            trade = self._ib.placeOrder(contract, order)
+            status = await self._wait_status(trade, timeout_s=1.0)
 
         logger.info(
             "真实下单 | amount_usd=${} | ticker={} | price={} | qty={} | status={}",
@@ -124,3 +141,85 @@ class IBExecutor:
             status,
         )
         return BuyResult(ticker=ticker, amount_usd=amount_usd, price=price, qty=qty, dry_run=False, order_status=status)
+
+    async def _wait_status(self, trade: Trade, timeout_s: float) -> str | None:
+        """Wait for TWS/IBG to post the first order status (at most timeout_s), then return it."""
+        fut: asyncio.Future[str | None] = asyncio.get_running_loop().create_future()
+
+        def _on_status(t: Trade) -> None:
+            if not fut.done():
+                fut.set_result(getattr(t.orderStatus, "status", None))
+
+        trade.statusEvent += _on_status
+        try:
+            return await asyncio.wait_for(fut, timeout=timeout_s)
+        except asyncio.TimeoutError:
+            return getattr(trade.orderStatus, "status", None)
+        finally:
+            trade.statusEvent -= _on_status
+
+
+async def _keepalive(ib: IB) -> None:
+    while True:
+        await asyncio.sleep(_KEEPALIVE_INTERVAL_S)
+        try:
+            await ib.reqCurrentTimeAsync()
+        except Exception:
+            logger.warning("IB 心跳失败")
+
+
+def _on_sigterm(task: asyncio.Task | None) -> None:
+    # Cancel rather than raise: an exception from a loop callback never reaches the task's finally blocks.
+    logger.warning("收到 SIGTERM：断开 IB 并取消主任务")
+    if _shared_ib is not None:
+        _shared_ib.disconnect()
+    if task is not None:
+        task.cancel()
+
+
+async def get_executor(dry_run: bool = True) -> IBExecutor:
+    """Return an executor bound to the process-wide IB connection.
+
+    The first call connects (TCP + API handshake); later calls reuse the connection.
+    dry_run is per executor, never shared: a dry-run caller cannot inherit a live setting.
+    Call shutdown_executor() once at the end of the process.
+    """
+    global _shared_ib, _shared_keepalive
+
+    async with _connect_lock:
+        if _shared_ib is None or not _shared_ib.isConnected():
+            # Reconnect: stop the heartbeat of the dead connection first.
+            if _shared_keepalive is not None:
+                _shared_keepalive.cancel()
+                _shared_keepalive = None
+            conn = IBExecutor(dry_run=True)
+            await conn.connect()
+            _shared_ib = conn.ib
+            _shared_keepalive = asyncio.create_task(_keepalive(_shared_ib))
+            try:
+                # SIGTERM cancels the task that opened the connection (the job's main task).
+                asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, _on_sigterm, asyncio.current_task())
+            except NotImplementedError:
+                pass
+
+    ex = IBExecutor(dry_run=dry_run)
+    ex._ib = _shared_ib
+    ex._shared = True
+    return ex
+
+
+async def shutdown_executor() -> None:
+    global _shared_ib, _shared_keepalive
+
+    try:
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGTERM)
+    except NotImplementedError:
+        pass
+    if _shared_keepalive is not None:
+        _shared_keepalive.cancel()
+        _shared_keepalive = None
+    if _shared_ib is not None:
+        try:
+            _shared_ib.disconnect()
+        finally:
+            _shared_ib = None
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
 
 from ib_insync import IB, Stock
@@ -24,33 +25,64 @@ class PositionValues:
     unrealized_pnl: float | None
 
 
-def _get_tag(values: list[object], tag: str) -> float | None:
-    for v in values:
-        # AccountValue has fields: tag, value, currency, account
-        if getattr(v, "tag", None) == tag:
-            raw = getattr(v, "value", None)
+class PriceCache:
+    """Snapshot prices by symbol, filled with one batched reqTickersAsync per prime().
+
+    Prime once per cycle with every ticker you will touch, then read via get().
+    """
+
+    def __init__(self, ib: IB) -> None:
+        self._ib = ib
+        self._prices: dict[str, float] = {}
+
+    async def prime(self, tickers: list[str]) -> None:
+        missing = [t for t in dict.fromkeys(tickers) if t and t not in self._prices]
+        if not missing:
+            return
+
+        contracts = [Stock(t, "SMART", "USD") for t in missing]
+        for t in await self._ib.reqTickersAsync(*contracts):
+            sym = getattr(t.contract, "symbol", None)
+            if not sym:
+                continue
+            mp = t.marketPrice()
+            if mp is None:
+                continue
             try:
-                return float(raw)
+                price = float(mp)
             except Exception:
-                return None
-    return None
+                continue
+            if math.isfinite(price):
+                self._prices[str(sym)] = price
+
+    def get(self, ticker: str) -> float | None:
+        return self._prices.get(ticker)
+
+
+def _to_float(raw: object) -> float | None:
+    try:
+        return float(raw)  # type: ignore[arg-type]
+    except Exception:
+        return None
 
 
 async def fetch_account_values(ib: IB) -> AccountValues:
     values = await ib.accountSummaryAsync()
+    # AccountValue has fields: tag, value, currency, account.
+    # Built from the reversed list so the first occurrence of a tag wins.
+    tag_map = {getattr(v, "tag", None): getattr(v, "value", None) for v in reversed(values)}
     return AccountValues(
-        net_liquidation=_get_tag(values, "NetLiquidation"),
-        total_cash=_get_tag(values, "TotalCashValue"),
-        buying_power=_get_tag(values, "BuyingPower"),
-        init_margin_req=_get_tag(values, "InitMarginReq"),
-        maint_margin_req=_get_tag(values, "MaintMarginReq"),
+        net_liquidation=_to_float(tag_map.get("NetLiquidation")),
+        total_cash=_to_float(tag_map.get("TotalCashValue")),
+        buying_power=_to_float(tag_map.get("BuyingPower")),
+        init_margin_req=_to_float(tag_map.get("InitMarginReq")),
+        maint_margin_req=_to_float(tag_map.get("MaintMarginReq")),
     )
 
 
-async def fetch_positions(ib: IB) -> list[PositionValues]:
+async def fetch_positions(ib: IB, prices: PriceCache | None = None) -> list[PositionValues]:
     positions = ib.positions()  # local cache after connection; OK for snapshots
     out: list[PositionValues] = []
-    contracts = []
 
     for p in positions:
         c = p.contract
@@ -67,29 +99,18 @@ async def fetch_positions(ib: IB) -> list[PositionValues]:
                 unrealized_pnl=None,
             )
         )
-        contracts.append(Stock(str(sym), "SMART", "USD"))
 
-    if not contracts:
+    if not out:
         return out
 
-    # Best-effort snapshot prices
-    tickers = await ib.reqTickersAsync(*contracts)
-    price_map: dict[str, float] = {}
-    for t in tickers:
-        sym = getattr(t.contract, "symbol", None)
-        if not sym:
-            continue
-        mp = t.marketPrice()
-        if mp is None:
-            continue
-        try:
-            price_map[str(sym)] = float(mp)
-        except Exception:
-            continue
+    # Best-effort snapshot prices (no extra request for symbols the caller already primed)
+    if prices is None:
+        prices = PriceCache(ib)
+    await prices.prime([p.ticker for p in out])
 
     out2: list[PositionValues] = []
     for p in out:
-        mp = price_map.get(p.ticker)
+        mp = prices.get(p.ticker)
         mv = None if mp is None else mp * p.position
         out2.append(
             PositionValues(
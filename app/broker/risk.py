@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 
+# Env vars are treated as fixed for the process lifetime, so parsed values are cached.
+# Call reset_env_cache() after changing os.environ (e.g. in tests).
 
+
+@lru_cache(maxsize=None)
 def get_float_env(name: str, default: float) -> float:
     raw = os.getenv(name)
     if raw is None:
@@ -13,6 +18,7 @@ def get_float_env(name: str, default: float) -> float:
         return default
 
 
+@lru_cache(maxsize=None)
 def get_int_env(name: str, default: int) -> int:
     raw = os.getenv(name)
     if raw is None:
@@ -21,3 +27,8 @@ def get_int_env(name: str, default: int) -> int:
         return int(raw)
     except Exception:
         return default
+
+
+def reset_env_cache() -> None:
+    get_float_env.cache_clear()
+    get_int_env.cache_clear()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import date, timedelta
+from itertools import islice
+from pathlib import Path
+
+from loguru import logger
+
+from app.collectors.state import default_state_dir
+
+# (symbols, start, end) -> {symbol: {session date: close}}
+Downloader = Callable[[list[str], date, date], dict[str, dict[date, float]]]
+
+_INSERT_BATCH = 10_000
+_CREATE_PRICES = (
+    "CREATE TABLE IF NOT EXISTS prices (symbol TEXT, d DATE, close DOUBLE, PRIMARY KEY (symbol, d))"
+)
+
+
+def default_price_cache_path() -> Path:
+    return default_state_dir() / "prices.duckdb"
+
+
+def load_closes(
+    symbols: list[str],
+    start: date,
+    end: date,
+    *,
+    download: Downloader,
+    settled_before: date,
+    path: Path | None = None,
+) -> dict[str, dict[date, float]]:
+    """Daily closes for [start, end], served from a local DuckDB cache; only missing tails are downloaded.
+
+    Only bars dated before `settled_before` are persisted, so an intraday "close" is never cached.
+    Without duckdb (or if the cache file is unusable) this is a plain download.
+    """
+    try:
+        import duckdb  # local import to avoid hard failure if dependency missing
+    except Exception:
+        return download(symbols, start, end)
+
+    path = path or default_price_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        con = duckdb.connect(str(path))
+    except Exception:
+        logger.exception("行情缓存不可用：直接下载 | path={}", str(path))
+        return download(symbols, start, end)
+
+    try:
+        con.execute(_CREATE_PRICES)
+
+        # Per symbol, the window to download. Coverage is judged from MIN(d)/MAX(d) alone, so every
+        # fill must keep the cached dates contiguous: a missing head is fetched up to the cached head
+        # (not just to `end`), a missing tail from the day after the cached tail.
+        fetch: dict[str, tuple[date, date]] = {}
+        for symbol in symbols:
+            lo, hi = con.execute("SELECT MIN(d), MAX(d) FROM prices WHERE symbol = ?", [symbol]).fetchone()
+            if lo is None:
+                fetch[symbol] = (start, end)
+            elif lo > start:
+                fetch[symbol] = (start, max(end, lo))
+            elif hi < end:
+                fetch[symbol] = (hi + timedelta(days=1), end)
+
+        fresh: dict[str, dict[date, float]] = {}
+        if fetch:
+            # One batched download over the union window; it overlaps or touches each symbol's cached range.
+            fresh = download(sorted(fetch), min(a for a, _ in fetch.values()), max(b for _, b in fetch.values()))
+            settled = [(s, d, c) for s, closes in fresh.items() for d, c in closes.items() if d < settled_before]
+            it = iter(settled)
+            while batch := list(islice(it, _INSERT_BATCH)):
+                con.executemany("INSERT OR IGNORE INTO prices VALUES (?, ?, ?)", batch)
+
+        placeholders = ", ".join("?" for _ in symbols)
+        rows = con.execute(
+            f"SELECT symbol, d, close FROM prices WHERE symbol IN ({placeholders}) AND d BETWEEN ? AND ?",
+            [*symbols, start, end],
+        ).fetchall()
+    finally:
+        con.close()
+
+    out: dict[str, dict[date, float]] = {}
+    for symbol, d, close in rows:
+        out.setdefault(symbol, {})[d] = close
+    # Unsettled (and any not-yet-cached) bars come straight from this run's download; a head fill
+    # may reach past `end`, so clamp to the requested window.
+    for symbol, closes in fresh.items():
+        in_range = {d: c for d, c in closes.items() if start <= d <= end}
+        if in_range:
+            out.setdefault(symbol, {}).update(in_range)
+    logger.info("行情缓存 | symbols={} | downloaded={}", len(symbols), len(fetch))
+    return out
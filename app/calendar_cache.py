@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+
+_CALENDAR_START = date(2015, 1, 1)
+# How far past today the calendar extends (covers T+7 of recent entries).
+_CALENDAR_AHEAD_DAYS = 30
+
+
+@dataclass(frozen=True)
+class TradingCalendar:
+    """NYSE sessions as a sorted tuple plus a date -> position map."""
+
+    sessions: tuple[date, ...]
+    index: dict[date, int]
+
+    def locate(self, d: date) -> int:
+        """Position of `d`, or of the next session if `d` is not a trading day."""
+        idx = self.index.get(d)
+        if idx is not None:
+            return idx
+        idx = bisect.bisect_left(self.sessions, d)
+        if idx >= len(self.sessions):
+            raise RuntimeError("无法找到下一交易日")
+        return idx
+
+
+@lru_cache(maxsize=1)
+def _build(end: date) -> TradingCalendar:
+    import pandas_market_calendars as mcal  # local import: pandas cost only on first build
+
+    sched = mcal.get_calendar("NYSE").schedule(start_date=_CALENDAR_START, end_date=end)
+    sessions = tuple(d.date() for d in sched.index.to_pydatetime())
+    return TradingCalendar(sessions=sessions, index={d: i for i, d in enumerate(sessions)})
+
+
+def get_trading_calendar() -> TradingCalendar:
+    """NYSE calendar from 2015-01-01 to today+30d, computed once per process (per day)."""
+    return _build(date.today() + timedelta(days=_CALENDAR_AHEAD_DAYS))
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import os
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
 from loguru import logger
 
+from app.collectors.seen import SeenUrls
+
 
 @dataclass(frozen=True)
 class RawNewsIn:
@@ -20,12 +23,18 @@ def _utc_now() -> datetime:
 
 
 class RedditCollector:
-    def __init__(self, subreddits: list[str], limit: int = 50) -> None:
+    def __init__(self, subreddits: list[str], limit: int = 50, seen: SeenUrls | None = None) -> None:
+        """seen: urls already stored by earlier runs; matching posts are dropped."""
         self._subreddits = subreddits
         self._limit = limit
+        self._seen = seen
 
     def fetch(self) -> list[RawNewsIn]:
-        """Fetch Reddit hot posts titles.
+        """Sync wrapper around fetch_async() for callers without a running loop."""
+        return asyncio.run(self.fetch_async())
+
+    async def fetch_async(self) -> list[RawNewsIn]:
+        """Fetch Reddit hot posts titles (all subreddits concurrently).
 
         Env vars required:
         - REDDIT_CLIENT_ID
@@ -42,9 +51,9 @@ class RedditCollector:
             return []
 
         try:
-            import praw  # local import to avoid hard failure if dependency missing
+            import asyncpraw  # local import to avoid hard failure if dependency missing
         except Exception:
-            logger.exception("praw 导入失败：跳过 Reddit 抓取")
+            logger.exception("asyncpraw 导入失败：跳过 Reddit 抓取")
             return []
 
         fetched_at = _utc_now()
@@ -52,44 +61,53 @@ class RedditCollector:
         out: list[RawNewsIn] = []
 
         try:
-            reddit = praw.Reddit(
+            async with asyncpraw.Reddit(
                 client_id=client_id,
                 client_secret=client_secret,
                 user_agent=user_agent,
-            )
-            for sub in self._subreddits:
-                try:
-                    sr = reddit.subreddit(sub)
-                    posts = list(sr.hot(limit=self._limit))
-                    logger.info("Reddit 抓取 | subreddit=r/{} | posts={}", sub, len(posts))
-
-                    for p in posts:
-                        title = (getattr(p, "title", None) or "").strip()
-                        permalink = (getattr(p, "permalink", None) or "").strip()
-                        url = f"https://www.reddit.com{permalink}" if permalink else (getattr(p, "url", None) or "")
-                        url = url.strip()
-                        # Ensure url is not empty; DB dedup relies on url unique.
-                        if not title and not url:
-                            continue
-
-                        key = url or title
-                        if key in seen:
-                            continue
-                        seen.add(key)
-
-                        out.append(
-                            RawNewsIn(
-                                source=f"reddit:r/{sub}",
-                                raw_title=title or url,
-                                url=url,
-                                fetched_at=fetched_at,
-                            )
-                        )
-                except Exception:
-                    logger.exception("Reddit 抓取失败 | subreddit=r/{}", sub)
-                    continue
+            ) as reddit:
+
+                async def _pull(sub: str) -> list[object]:
+                    sr = await reddit.subreddit(sub)
+                    return [p async for p in sr.hot(limit=self._limit)]
+
+                results = await asyncio.gather(*[_pull(s) for s in self._subreddits], return_exceptions=True)
         except Exception:
             logger.exception("Reddit 初始化失败：跳过 Reddit 抓取")
             return []
 
+        for sub, posts in zip(self._subreddits, results):
+            if isinstance(posts, BaseException):
+                logger.opt(exception=posts).error("Reddit 抓取失败 | subreddit=r/{}", sub)
+                continue
+
+            logger.info("Reddit 抓取 | subreddit=r/{} | posts={}", sub, len(posts))
+
+            for p in posts:
+                title = (getattr(p, "title", None) or "").strip()
+                permalink = (getattr(p, "permalink", None) or "").strip()
+                url = f"https://www.reddit.com{permalink}" if permalink else (getattr(p, "url", None) or "")
+                url = url.strip()
+                # Ensure url is not empty; DB dedup relies on url unique.
+                if not title and not url:
+                    continue
+
+                key = url or title
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                if url and self._seen is not None and url in self._seen:
+                    logger.debug("Reddit 帖子已入库过：跳过 | subreddit=r/{} | url={}", sub, url)
+                    continue
+
+                out.append(
+                    RawNewsIn(
+                        source=f"reddit:r/{sub}",
+                        raw_title=title or url,
+                        url=url,
+                        fetched_at=fetched_at,
+                    )
+                )
+
         return out
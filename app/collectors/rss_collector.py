@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from pathlib import Path
 
 import feedparser
+import httpx
 from loguru import logger
 
+from app.collectors.seen import SeenUrls
+from app.collectors.state import load_json_state, save_json_state
+
 
 @dataclass(frozen=True)
 class RSSSource:
@@ -21,37 +30,146 @@ class RawNewsIn:
     fetched_at: datetime
 
 
+# We only read entry title + link, so skip feedparser's per-entry HTML sanitizer and
+# relative-URI rewriting. Set at import so pool workers (which import this module) get it too.
+feedparser.SANITIZE_HTML = False
+feedparser.RESOLVE_RELATIVE_URIS = False
+
+# feedparser is pure Python and holds the GIL; parse feeds in worker processes.
+# Created on first use, when the loop's resolver threads already exist: workers must not be
+# fork()ed from that multi-threaded process, so they start fresh and import this module.
+_PARSER_POOL: ProcessPoolExecutor | None = None
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _parser_pool(n_feeds: int) -> ProcessPoolExecutor:
+    global _PARSER_POOL
+    if _PARSER_POOL is None:
+        # No more workers than feeds to parse.
+        workers = max(1, min(n_feeds, os.cpu_count() or 1))
+        _PARSER_POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(_START_METHOD))
+    return _PARSER_POOL
+
+# Shared keep-alive client: repeat fetches to a host reuse TCP/TLS and multiplex over HTTP/2.
+_HTTP: httpx.AsyncClient | None = None
+_HTTP_LOOP: asyncio.AbstractEventLoop | None = None
+
+
+def _http_client() -> httpx.AsyncClient:
+    """Return the shared client for the running loop (pooled connections cannot cross event loops)."""
+    global _HTTP, _HTTP_LOOP
+    loop = asyncio.get_running_loop()
+    if _HTTP is None or _HTTP_LOOP is not loop:
+        _HTTP = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+        )
+        _HTTP_LOOP = loop
+    return _HTTP
+
+
+async def aclose_http_client() -> None:
+    global _HTTP, _HTTP_LOOP
+    if _HTTP is not None:
+        client, _HTTP, _HTTP_LOOP = _HTTP, None, None
+        await client.aclose()
+
+
 def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _parse_entries(body: bytes) -> list[tuple[str, str]]:
+    """Parse a feed body into (title, link) pairs.
+
+    Runs inside the parser pool; returns plain tuples to keep pickling cheap.
+    """
+    feed = feedparser.parse(body)
+    entries = getattr(feed, "entries", []) or []
+    return [((getattr(e, "title", None) or ""), (getattr(e, "link", None) or "")) for e in entries]
+
+
 class RSSCollector:
-    def __init__(self, sources: list[RSSSource]) -> None:
+    def __init__(self, sources: list[RSSSource], state_path: Path | None = None, seen: SeenUrls | None = None) -> None:
+        """state_path: JSON file keeping each feed's ETag/Last-Modified between runs.
+
+        When set, feeds are fetched with conditional GETs and unchanged feeds (304) are skipped.
+        New validators are only written by save_state(), once the fetched items are stored.
+        seen: urls already stored by earlier runs; matching entries are dropped.
+        """
         self._sources = sources
+        self._state_path = state_path
+        self._seen = seen
+        # Validators from the last fetch, held until the caller has stored its items.
+        self._pending_state: dict[str, dict[str, str]] | None = None
 
     def fetch(self) -> list[RawNewsIn]:
+        """Sync wrapper around fetch_async() for callers without a running loop."""
+
+        async def _run() -> list[RawNewsIn]:
+            try:
+                return await self.fetch_async()
+            finally:
+                await aclose_http_client()
+
+        return asyncio.run(_run())
+
+    async def fetch_async(self) -> list[RawNewsIn]:
         """Fetch RSS items and normalize into RawNewsIn.
 
-        - Dedup based on url or title (in-memory)
+        - All feeds are downloaded concurrently (shared keep-alive HTTP/2 client)
+        - With state_path, unchanged feeds (HTTP 304) are skipped without parsing
+        - Dedup based on url or title (in-memory), plus `seen` across runs
         - fetched_at is always UTC now
         """
         fetched_at = _utc_now()
         seen: set[str] = set()
         out: list[RawNewsIn] = []
 
-        for src in self._sources:
-            try:
-                feed = feedparser.parse(src.url)
-            except Exception:
-                logger.exception("RSS 抓取失败 | source={} | url={}", src.name, src.url)
+        state = load_json_state(self._state_path) if self._state_path is not None else {}
+
+        client = _http_client()
+        responses = await asyncio.gather(
+            *[self._download(client, src, state.get(src.url, {})) for src in self._sources],
+            return_exceptions=True,
+        )
+
+        pool = _parser_pool(len(self._sources))
+        parse_futs: dict[int, asyncio.Future[list[tuple[str, str]]]] = {}
+        fresh_validators: dict[int, dict[str, str]] = {}
+        for idx, (src, resp) in enumerate(zip(self._sources, responses)):
+            if isinstance(resp, BaseException):
+                logger.opt(exception=resp).error("RSS 抓取失败 | source={} | url={}", src.name, src.url)
+                continue
+
+            body, validators = resp
+            if body is None:
+                logger.info("RSS 未更新（304）：跳过 | source={}", src.name)
                 continue
+            fresh_validators[idx] = validators
+            parse_futs[idx] = asyncio.wrap_future(pool.submit(_parse_entries, body))
+
+        parsed = await asyncio.gather(*parse_futs.values(), return_exceptions=True)
+
+        state_changed = False
+        for idx, entries in zip(parse_futs.keys(), parsed):
+            src = self._sources[idx]
+            if isinstance(entries, BaseException):
+                logger.opt(exception=entries).error("RSS 解析失败 | source={} | url={}", src.name, src.url)
+                continue
+
+            # Only remember validators of feeds we actually parsed; a failed parse must be retried in full.
+            if fresh_validators[idx] != state.get(src.url):
+                state[src.url] = fresh_validators[idx]
+                state_changed = True
 
-            entries = getattr(feed, "entries", []) or []
             logger.info("RSS 抓取 | source={} | entries={}", src.name, len(entries))
 
-            for e in entries:
-                title = (getattr(e, "title", None) or "").strip()
-                url = (getattr(e, "link", None) or "").strip()
+            for raw_title, raw_url in entries:
+                title = raw_title.strip()
+                url = raw_url.strip()
                 if not title and not url:
                     continue
 
@@ -60,6 +178,10 @@ class RSSCollector:
                     continue
                 seen.add(key)
 
+                if url and self._seen is not None and url in self._seen:
+                    logger.debug("RSS 条目已入库过：跳过 | source={} | url={}", src.name, url)
+                    continue
+
                 if not url:
                     # Without url, DB-level unique dedup cannot work reliably; still keep it in memory,
                     # but main pipeline will skip url-less records when inserting.
@@ -74,4 +196,42 @@ class RSSCollector:
                     )
                 )
 
+        self._pending_state = state if state_changed else None
         return out
+
+    def save_state(self) -> None:
+        """Persist the validators from the last fetch.
+
+        Call only after its items are committed: a feed that answers 304 next run is not
+        collected again, so if the insert fails those entries must be fetched in full.
+        """
+        if self._state_path is None or self._pending_state is None:
+            return
+        try:
+            save_json_state(self._state_path, self._pending_state)
+            self._pending_state = None
+        except Exception:
+            logger.exception("RSS 状态保存失败 | path={}", str(self._state_path))
+
+    async def _download(
+        self, client: httpx.AsyncClient, src: RSSSource, validators: dict[str, str]
+    ) -> tuple[bytes | None, dict[str, str]]:
+        """GET a feed; returns (None, validators) when the server answers 304 Not Modified."""
+        headers: dict[str, str] = {}
+        if self._state_path is not None:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("modified"):
+                headers["If-Modified-Since"] = validators["modified"]
+
+        resp = await client.get(src.url, headers=headers)
+        if resp.status_code == 304:
+            return None, validators
+        resp.raise_for_status()
+
+        fresh: dict[str, str] = {}
+        if resp.headers.get("ETag"):
+            fresh["etag"] = resp.headers["ETag"]
+        if resp.headers.get("Last-Modified"):
+            fresh["modified"] = resp.headers["Last-Modified"]
+        return resp.content, fresh
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+
+class SeenUrls:
+    """On-disk bloom filter of urls already stored in raw_news.
+
+    Collectors skip urls found here, so cross-run duplicates never reach the DB.
+    The filter can report false positives (~0.1%), never false negatives.
+    Degrades to a no-op filter if pybloom_live is missing or the file is unreadable.
+    """
+
+    def __init__(self, path: Path, bloom: Any | None) -> None:
+        self._path = path
+        self._bloom = bloom
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: Path) -> "SeenUrls":
+        try:
+            from pybloom_live import ScalableBloomFilter  # local import to avoid hard failure if dependency missing
+        except Exception:
+            logger.warning("pybloom_live 导入失败：跨批次 url 去重关闭")
+            return cls(path, None)
+
+        try:
+            with path.open("rb") as f:
+                bloom = ScalableBloomFilter.fromfile(f)
+        except FileNotFoundError:
+            bloom = ScalableBloomFilter(mode=ScalableBloomFilter.SMALL_SET_GROWTH, error_rate=0.001)
+        except Exception:
+            logger.exception("url 去重文件损坏：重新创建 | path={}", str(path))
+            bloom = ScalableBloomFilter(mode=ScalableBloomFilter.SMALL_SET_GROWTH, error_rate=0.001)
+        return cls(path, bloom)
+
+    def __contains__(self, url: str) -> bool:
+        return self._bloom is not None and url in self._bloom
+
+    def add_many(self, urls: Iterable[str]) -> None:
+        if self._bloom is None:
+            return
+        for url in urls:
+            if url and not self._bloom.add(url):
+                self._dirty = True
+
+    def save(self) -> None:
+        if self._bloom is None or not self._dirty:
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(self._path.suffix + ".tmp")
+        with tmp.open("wb") as f:
+            self._bloom.tofile(f)
+        tmp.replace(self._path)
+        self._dirty = False
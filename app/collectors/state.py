@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from loguru import logger
+
+
+def default_state_dir() -> Path:
+    """Directory for collector state that must survive between runs."""
+    return Path(os.getenv("TRADING_STATE_DIR", str(Path.home() / ".trading")))
+
+
+def load_json_state(path: Path) -> dict[str, dict[str, str]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        logger.warning("采集状态文件损坏：忽略 | path={}", str(path))
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_json_state(path: Path, data: dict[str, dict[str, str]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
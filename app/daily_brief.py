@@ -2,12 +2,20 @@ from __future__ import annotations
 
 import asyncio
 import os
+from collections import defaultdict
+from collections.abc import Iterator
 from dataclasses import dataclass
+from itertools import islice
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Any
 
 from loguru import logger
-from sqlalchemy import desc, select
+from sqlalchemy import DateTime, Executable, bindparam, desc, func, lambda_stmt, select
+from sqlalchemy.dialects.postgresql import distinct_on
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
 from app.db.models import AccountSnapshot, NewsAlert, PositionSnapshot, TradeExecution, TradeOutcome
 from app.db.session import build_engine, build_session_maker, init_db
@@ -40,116 +48,176 @@ def _day_start_utc(now_utc: datetime) -> datetime:
     return now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
 
 
-async def _load_data(*, now_utc: datetime) -> BriefData:
-    engine = build_engine()
-    session_maker = build_session_maker(engine)
-    try:
-        # Ensure tables exist (safe create_all)
-        await init_db(engine)
+# Brief queries are lambda statements: compiled once per process, only the
+# captured datetimes change between runs (extracted as bound params).
+_ACCT_STMT = lambda_stmt(lambda: select(AccountSnapshot).order_by(desc(AccountSnapshot.created_at)).limit(1))
+_OUTCOMES_STMT = lambda_stmt(lambda: select(TradeOutcome).order_by(desc(TradeOutcome.computed_at)).limit(50))
 
-        async with session_maker() as session:
-            start = _day_start_utc(now_utc)
 
-            alerts_stmt = select(NewsAlert).where(NewsAlert.created_at >= start).order_by(NewsAlert.created_at.desc()).limit(200)
-            alerts = list((await session.execute(alerts_stmt)).scalars().all())
+_ALERTS_PER_KEYWORD = 30
 
-            acct_stmt = select(AccountSnapshot).order_by(desc(AccountSnapshot.created_at)).limit(1)
-            latest_account = (await session.execute(acct_stmt)).scalar_one_or_none()
 
-            # Latest position snapshot batch: take last 1 hour window as "latest set"
-            pos_cutoff = now_utc - timedelta(hours=1)
-            pos_stmt = (
-                select(PositionSnapshot)
-                .where(PositionSnapshot.created_at >= pos_cutoff)
-                .order_by(desc(PositionSnapshot.created_at))
-                .limit(500)
-            )
-            positions = list((await session.execute(pos_stmt)).scalars().all())
+def _build_alerts_stmt() -> Executable:
+    # Newest N alerts per keyword since :start, ranked in SQL so one noisy keyword cannot flood memory.
+    rn = func.row_number().over(partition_by=NewsAlert.keyword, order_by=NewsAlert.created_at.desc()).label("rn")
+    ranked = (
+        select(NewsAlert, rn)
+        .where(NewsAlert.created_at >= bindparam("start", type_=DateTime(timezone=True)))
+        .subquery()
+    )
+    alert = aliased(NewsAlert, ranked)
+    return (
+        select(alert)
+        .where(ranked.c.rn <= _ALERTS_PER_KEYWORD)
+        .order_by(alert.keyword, alert.created_at.desc())
+    )
 
-            exec_stmt = select(TradeExecution).where(TradeExecution.created_at >= start).order_by(desc(TradeExecution.created_at)).limit(50)
-            executions = list((await session.execute(exec_stmt)).scalars().all())
 
-            out_stmt = select(TradeOutcome).order_by(desc(TradeOutcome.computed_at)).limit(50)
-            outcomes = list((await session.execute(out_stmt)).scalars().all())
+# Built once (the subquery is referenced twice, which a lambda statement cannot express); pass {"start": ...}.
+_ALERTS_STMT = _build_alerts_stmt()
 
-            return BriefData(alerts=alerts, latest_account=latest_account, positions=positions, executions=executions, outcomes=outcomes)
-    finally:
-        await engine.dispose()
 
+def _positions_stmt(pos_cutoff: datetime) -> StatementLambdaElement:
+    # Latest row per ticker, deduplicated by Postgres (DISTINCT ON).
+    return lambda_stmt(
+        lambda: select(PositionSnapshot)
+        .ext(distinct_on(PositionSnapshot.ticker))
+        .where(PositionSnapshot.created_at >= pos_cutoff)
+        .order_by(PositionSnapshot.ticker, desc(PositionSnapshot.created_at))
+        .limit(500)
+    )
+
+
+def _executions_stmt(start: datetime) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(TradeExecution)
+        .where(TradeExecution.created_at >= start)
+        .order_by(desc(TradeExecution.created_at))
+        .limit(50)
+    )
+
+
+async def _fetch_all(
+    session_maker: async_sessionmaker[AsyncSession], stmt: Executable, params: dict[str, Any] | None = None
+) -> list[Any]:
+    # One session (pooled connection) per query so independent queries run concurrently.
+    async with session_maker() as session:
+        return list((await session.execute(stmt, params)).scalars().all())
+
+
+# Process-wide engine/session maker: repeated briefs reuse the warm pool instead of rebuilding it.
+_ENGINE: AsyncEngine | None = None
+_SESSION: async_sessionmaker[AsyncSession] | None = None
+_inited = False
+
+
+async def _get_session_maker() -> async_sessionmaker[AsyncSession]:
+    global _ENGINE, _SESSION, _inited
+    if _ENGINE is None or _SESSION is None:
+        _ENGINE = build_engine()
+        _SESSION = build_session_maker(_ENGINE)
+    if not _inited:
+        # Ensure tables exist (safe create_all), once per process
+        await init_db(_ENGINE)
+        _inited = True
+    return _SESSION
+
+
+async def _dispose_engine() -> None:
+    # Pooled asyncpg connections are bound to the loop that opened them; dispose before it closes.
+    if _ENGINE is not None:
+        await _ENGINE.dispose()
 
-def _render_markdown(*, now_utc: datetime, data: BriefData) -> str:
-    lines: list[str] = []
-    lines.append(f"# Daily Brief — {now_utc.date().isoformat()} (UTC)\n")
-    lines.append(f"Generated at: {now_utc.isoformat()}Z\n")
+
+async def _load_data(*, now_utc: datetime) -> BriefData:
+    session_maker = await _get_session_maker()
+
+    start = _day_start_utc(now_utc)
+    # Latest position snapshot batch: take last 1 hour window as "latest set"
+    pos_cutoff = now_utc - timedelta(hours=1)
+
+    alerts, accounts, positions, executions, outcomes = await asyncio.gather(
+        _fetch_all(session_maker, _ALERTS_STMT, {"start": start}),
+        _fetch_all(session_maker, _ACCT_STMT),
+        _fetch_all(session_maker, _positions_stmt(pos_cutoff)),
+        _fetch_all(session_maker, _executions_stmt(start)),
+        _fetch_all(session_maker, _OUTCOMES_STMT),
+    )
+    latest_account = accounts[0] if accounts else None
+
+    return BriefData(alerts=alerts, latest_account=latest_account, positions=positions, executions=executions, outcomes=outcomes)
+
+
+def _iter_lines(*, now_utc: datetime, data: BriefData) -> Iterator[str]:
+    """Yield brief lines without trailing newlines."""
+    yield f"# Daily Brief — {now_utc.date().isoformat()} (UTC)"
+    yield f"Generated at: {now_utc.isoformat()}Z"
 
     # Account
-    lines.append("\n## Account Snapshot (latest)\n")
+    yield ""
+    yield "## Account Snapshot (latest)"
     a = data.latest_account
     if a is None:
-        lines.append("- (no account snapshot)\n")
+        yield "- (no account snapshot)"
     else:
-        lines.append(f"- NetLiquidation: {a.net_liquidation}\n")
-        lines.append(f"- TotalCash: {a.total_cash}\n")
-        lines.append(f"- BuyingPower: {a.buying_power}\n")
-        lines.append(f"- InitMarginReq: {a.init_margin_req}\n")
-        lines.append(f"- MaintMarginReq: {a.maint_margin_req}\n")
-        lines.append(f"- at: {a.created_at.isoformat()}\n")
+        yield f"- NetLiquidation: {a.net_liquidation}"
+        yield f"- TotalCash: {a.total_cash}"
+        yield f"- BuyingPower: {a.buying_power}"
+        yield f"- InitMarginReq: {a.init_margin_req}"
+        yield f"- MaintMarginReq: {a.maint_margin_req}"
+        yield f"- at: {a.created_at.isoformat()}"
 
     # Positions
-    lines.append("\n## Positions (latest ~1h window, may include duplicates)\n")
+    yield ""
+    yield "## Positions (latest per ticker, ~1h window)"
     if not data.positions:
-        lines.append("- (no position snapshot)\n")
+        yield "- (no position snapshot)"
     else:
-        # De-dup by ticker keeping first occurrence
-        seen: set[str] = set()
         for p in data.positions:
-            if p.ticker in seen:
-                continue
-            seen.add(p.ticker)
-            lines.append(
-                f"- {p.ticker}: pos={p.position} avg_cost={p.avg_cost} mkt_price={p.market_price} mkt_value={p.market_value} at={p.created_at.isoformat()}\n"
-            )
+            yield f"- {p.ticker}: pos={p.position} avg_cost={p.avg_cost} mkt_price={p.market_price} mkt_value={p.market_value} at={p.created_at.isoformat()}"
 
     # Executions
-    lines.append("\n## Executions (today)\n")
+    yield ""
+    yield "## Executions (today)"
     if not data.executions:
-        lines.append("- (no executions)\n")
+        yield "- (no executions)"
     else:
         for e in data.executions:
-            lines.append(
-                f"- {e.created_at.isoformat()} | {e.ticker} | amount={e.amount_usd} | dry_run={e.dry_run} | price={e.price} | qty={e.qty} | status={e.order_status} | error={e.error}\n"
-            )
+            yield f"- {e.created_at.isoformat()} | {e.ticker} | amount={e.amount_usd} | dry_run={e.dry_run} | price={e.price} | qty={e.qty} | status={e.order_status} | error={e.error}"
 
     # Outcomes
-    lines.append("\n## Strategy Outcomes (T+3 / T+7 close-to-close, vs SPY)\n")
+    yield ""
+    yield "## Strategy Outcomes (T+3 / T+7 close-to-close, vs SPY)"
     if not data.outcomes:
-        lines.append("- (no outcomes computed yet)\n")
+        yield "- (no outcomes computed yet)"
     else:
         for o in data.outcomes[:20]:
-            lines.append(
-                f"- exec_id={o.trade_execution_id} {o.ticker} entry={o.entry_session} | T+3={o.t3_return:.3%} (SPY {o.spy_t3_return:.3%}) | T+7={o.t7_return:.3%} (SPY {o.spy_t7_return:.3%}) | computed_at={o.computed_at.isoformat()}\n"
-            )
+            yield f"- exec_id={o.trade_execution_id} {o.ticker} entry={o.entry_session} | T+3={o.t3_return:.3%} (SPY {o.spy_t3_return:.3%}) | T+7={o.t7_return:.3%} (SPY {o.spy_t7_return:.3%}) | computed_at={o.computed_at.isoformat()}"
 
     # Alerts
-    lines.append("\n## News Alerts (today, keyword hits)\n")
+    yield ""
+    yield "## News Alerts (today, keyword hits)"
     if not data.alerts:
-        lines.append("- (no alerts)\n")
+        yield "- (no alerts)"
     else:
         # group by keyword
-        by_kw: dict[str, list[NewsAlert]] = {}
+        by_kw: defaultdict[str, list[NewsAlert]] = defaultdict(list)
         for al in data.alerts:
-            by_kw.setdefault(al.keyword, []).append(al)
+            by_kw[al.keyword].append(al)
 
-        for kw in sorted(by_kw.keys()):
-            lines.append(f"\n### {kw}\n")
-            for al in by_kw[kw][:30]:
+        for kw, group in sorted(by_kw.items()):
+            yield ""
+            yield f"### {kw}"
+            for al in islice(group, _ALERTS_PER_KEYWORD):
                 title = al.title.replace("\n", " ").strip()
                 if al.url:
-                    lines.append(f"- [{title}]({al.url}) — {al.source} ({al.created_at.isoformat()})\n")
+                    yield f"- [{title}]({al.url}) — {al.source} ({al.created_at.isoformat()})"
                 else:
-                    lines.append(f"- {title} — {al.source} ({al.created_at.isoformat()})\n")
+                    yield f"- {title} — {al.source} ({al.created_at.isoformat()})"
 
-    return "".join(lines)
+
+def _render_markdown(*, now_utc: datetime, data: BriefData) -> str:
+    return "\n".join(_iter_lines(now_utc=now_utc, data=data)) + "\n"
 
 
 async def _async_main() -> int:
@@ -161,14 +229,22 @@ async def _async_main() -> int:
     out_dir = Path(_get_str_env("BRIEF_MD_DIR", str(_default_brief_dir())))
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / f"{now_utc.date().isoformat()}-brief.md"
-    out_path.write_text(md, encoding="utf-8")
+    # Encode once and write raw bytes (no TextIOWrapper re-encoding pass).
+    out_path.write_bytes(md.encode("utf-8"))
 
     logger.info("已生成每日简报 | path={}", str(out_path))
     return 0
 
 
+async def _run() -> int:
+    try:
+        return await _async_main()
+    finally:
+        await _dispose_engine()
+
+
 def main() -> int:
-    return asyncio.run(_async_main())
+    return asyncio.run(_run())
 
 
 if __name__ == "__main__":
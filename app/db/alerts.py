@@ -3,35 +3,46 @@ from __future__ import annotations
 from collections.abc import Sequence
 from datetime import datetime
 
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import NewsAlert
 
 
-async def insert_news_alerts(
+async def insert_news_alerts_bulk(
     session: AsyncSession,
     *,
-    keyword: str,
-    items: Sequence[tuple[str, str, str]],
+    items: Sequence[tuple[str, str, str, str]],
     created_at: datetime,
 ) -> int:
-    """Insert alerts.
+    """Insert alerts for all keywords with one executemany INSERT.
 
-    items: (source, title, url)
+    items: (keyword, source, title, url)
     """
     if not items:
         return 0
 
-    session.add_all(
+    await session.execute(
+        insert(NewsAlert),
         [
-            NewsAlert(
-                keyword=keyword,
-                source=src,
-                title=title,
-                url=url,
-                created_at=created_at,
-            )
-            for (src, title, url) in items
-        ]
+            {"keyword": kw, "source": src, "title": title, "url": url, "created_at": created_at}
+            for (kw, src, title, url) in items
+        ],
     )
     return len(items)
+
+
+async def insert_news_alerts(
+    session: AsyncSession,
+    *,
+    keyword: str,
+    items: Sequence[tuple[str, str, str]],
+    created_at: datetime,
+) -> int:
+    """Insert alerts.
+
+    items: (source, title, url)
+    """
+    return await insert_news_alerts_bulk(
+        session, items=[(keyword, src, title, url) for (src, title, url) in items], created_at=created_at
+    )
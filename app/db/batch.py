@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_DEFAULT_INSERT_CHUNK_SIZE = 1000
+
+
+def insert_chunk_size() -> int:
+    """Rows per executemany INSERT (env INSERT_CHUNK_SIZE, default 1000)."""
+    try:
+        n = int(os.getenv("INSERT_CHUNK_SIZE", str(_DEFAULT_INSERT_CHUNK_SIZE)))
+    except ValueError:
+        return _DEFAULT_INSERT_CHUNK_SIZE
+    return n if n > 0 else _DEFAULT_INSERT_CHUNK_SIZE
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    # itertools.batched is 3.12+; same semantics (last chunk may be short).
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
@@ -5,15 +5,25 @@ from dataclasses import dataclass
 from datetime import datetime
 
 from loguru import logger
-from sqlalchemy import func, select
+from sqlalchemy import Row, column, lambda_stmt, select, table, text
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.collectors.rss_collector import RawNewsIn
-from app.db.models import RawNews, SentimentSignal
+from app.db.batch import chunked, insert_chunk_size
+from app.db.models import NO_RISK_PREDICATE, RawNews, SentimentSignal
 from app.processors.ai_analyzer import AnalyzedItem
 
 
+# Session-local staging table for COPY; emptied at commit and truncated before each load.
+_RAW_NEWS_STAGE_COLUMNS = ("source", "raw_title", "url", "fetched_at")
+_RAW_NEWS_STAGE = table("raw_news_stage", *[column(c) for c in _RAW_NEWS_STAGE_COLUMNS])
+_CREATE_RAW_NEWS_STAGE = text(
+    "CREATE TEMP TABLE IF NOT EXISTS raw_news_stage "
+    "(source varchar(64), raw_title text, url text, fetched_at timestamptz) ON COMMIT DELETE ROWS"
+)
+
+
 @dataclass(frozen=True)
 class InsertedRawNews:
     id: int
@@ -26,32 +36,37 @@ class InsertedRawNews:
 async def insert_raw_news(session: AsyncSession, items: Sequence[RawNewsIn]) -> list[InsertedRawNews]:
     """Insert RawNews rows with ON CONFLICT DO NOTHING.
 
+    On asyncpg, rows are streamed into a TEMP staging table with COPY, then moved into
+    raw_news with a single INSERT ... SELECT, so the cost stays one round-trip per step
+    regardless of batch size. Other drivers use one multi-VALUES INSERT.
+
     Returns rows that were actually inserted (for downstream AI analysis dedup).
     """
     if not items:
         return []
 
-    values = [
-        {
-            "source": i.source,
-            "raw_title": i.raw_title,
-            "url": i.url,
-            "fetched_at": i.fetched_at,
-        }
-        for i in items
-        if i.url  # url required for DB unique dedup
-    ]
+    # Dedup by url before hitting the DB (first seen wins, like the collectors' own `seen` set);
+    # url is required for DB unique dedup.
+    by_url: dict[str, RawNewsIn] = {}
+    for i in items:
+        if i.url and i.url not in by_url:
+            by_url[i.url] = i
+
+    records = [(i.source, i.raw_title, i.url, i.fetched_at) for i in by_url.values()]
 
-    if not values:
+    if not records:
         logger.warning("RawNews 入库跳过：所有数据缺少 url")
         return []
 
-    stmt = insert(RawNews).values(values)
-    stmt = stmt.on_conflict_do_nothing(index_elements=[RawNews.url])
-    stmt = stmt.returning(RawNews.id, RawNews.source, RawNews.raw_title, RawNews.url, RawNews.fetched_at)
-
-    result = await session.execute(stmt)
-    rows = result.fetchall()
+    conn = await session.connection()
+    if conn.dialect.driver == "asyncpg":
+        rows = await _insert_raw_news_copy(session, records)
+    else:
+        # copy_records_to_table is asyncpg-only.
+        stmt = insert(RawNews).values([dict(zip(_RAW_NEWS_STAGE_COLUMNS, r)) for r in records])
+        stmt = stmt.on_conflict_do_nothing(index_elements=[RawNews.url])
+        stmt = stmt.returning(RawNews.id, RawNews.source, RawNews.raw_title, RawNews.url, RawNews.fetched_at)
+        rows = (await session.execute(stmt)).fetchall()
 
     inserted: list[InsertedRawNews] = [
         InsertedRawNews(
@@ -66,32 +81,57 @@ async def insert_raw_news(session: AsyncSession, items: Sequence[RawNewsIn]) ->
     return inserted
 
 
+async def _insert_raw_news_copy(session: AsyncSession, records: list[tuple]) -> list[Row]:
+    stage = _RAW_NEWS_STAGE.c
+    stmt = insert(RawNews).from_select(
+        list(_RAW_NEWS_STAGE_COLUMNS),
+        select(stage.source, stage.raw_title, stage.url, stage.fetched_at),
+    )
+    stmt = stmt.on_conflict_do_nothing(index_elements=[RawNews.url])
+    stmt = stmt.returning(RawNews.id, RawNews.source, RawNews.raw_title, RawNews.url, RawNews.fetched_at)
+
+    async with session.begin_nested():
+        await session.execute(_CREATE_RAW_NEWS_STAGE)
+        await session.execute(text("TRUNCATE raw_news_stage"))
+
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "raw_news_stage", records=records, columns=_RAW_NEWS_STAGE_COLUMNS
+        )
+
+        result = await session.execute(stmt)
+        return list(result.fetchall())
+
+
 async def insert_signals(session: AsyncSession, items: Sequence[AnalyzedItem], created_at: datetime) -> int:
     if not items:
         return 0
 
+    # The run's signals go in as Core executemany; they are never read back, so ORM objects would be pure overhead.
     rows = [
-        SentimentSignal(
-            ticker=i.ticker,
-            score=i.sentiment,
-            risk_tags=i.risk_tags,
-            ai_summary=i.summary,
-            created_at=created_at,
-        )
+        {
+            "ticker": i.ticker,
+            "score": i.sentiment,
+            "risk_tags": i.risk_tags,
+            "ai_summary": i.summary,
+            "created_at": created_at,
+        }
         for i in items
     ]
-    session.add_all(rows)
+    # Bounded batches keep each statement in the executemany sweet spot on large bursts.
+    for chunk in chunked(rows, insert_chunk_size()):
+        await session.execute(insert(SentimentSignal), chunk)
     return len(rows)
 
 
 async def select_top1_today_no_risk(session: AsyncSession, day_start_utc: datetime) -> SentimentSignal | None:
-    empty_risk = func.coalesce(func.jsonb_array_length(SentimentSignal.risk_tags), 0) == 0
-
-    stmt = (
-        select(SentimentSignal)
+    # lambda_stmt: SQL is compiled once per process; day_start_utc is extracted as a bound param.
+    stmt = lambda_stmt(
+        lambda: select(SentimentSignal)
         .where(SentimentSignal.created_at >= day_start_utc)
         .where(SentimentSignal.ticker.is_not(None))
-        .where(empty_risk)
+        .where(NO_RISK_PREDICATE)
         .order_by(SentimentSignal.score.desc())
         .limit(1)
     )
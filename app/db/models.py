@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import Boolean, DateTime, Float, Integer, String, Text
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import ARRAY, Boolean, Computed, Date, DateTime, Float, Index, Integer, String, Text, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 # Note: keep ORM models simple; migrations can be added later if needed.
@@ -29,11 +28,33 @@ class SentimentSignal(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     ticker: Mapped[str | None] = mapped_column(String(16), nullable=True, index=True)
     score: Mapped[float] = mapped_column(Float, nullable=False)
-    risk_tags: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
+    risk_tags: Mapped[list[str]] = mapped_column(
+        ARRAY(String(32)), nullable=False, default=list, server_default=text("'{}'")
+    )
     ai_summary: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
 
 
+# "No risk tags" predicate shared by the partial index below and select_top1_today_no_risk.
+# Keep it literal SQL (not a bound param) so the planner can match the partial index.
+NO_RISK_PREDICATE = text("risk_tags = '{}'")
+
+# Top1 lookup: today's rows with a ticker and no risk tags. The partial index holds only candidate
+# rows, so the day range scan touches nothing else before the top-score pick.
+Index(
+    "ix_sentiment_signal_top1",
+    SentimentSignal.created_at,
+    SentimentSignal.score.desc(),
+    postgresql_where=text(f"ticker IS NOT NULL AND {NO_RISK_PREDICATE.text}"),
+)
+
+# Tag containment / overlap probes (risk_tags @> ARRAY['诉讼'], risk_tags && ...).
+Index("ix_sentiment_signal_risk_tags_arr", SentimentSignal.risk_tags, postgresql_using="gin")
+
+
+ENTRY_SESSION_ET_EXPR = "(created_at AT TIME ZONE 'America/New_York')::date"
+
+
 class TradeExecution(Base):
     __tablename__ = "trade_execution"
 
@@ -45,7 +66,16 @@ class TradeExecution(Base):
     dry_run: Mapped[bool] = mapped_column(Boolean, nullable=False)
     order_status: Mapped[str | None] = mapped_column(String(64), nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    # Indexed through ix_trade_execution_created_id (created_at is its leading column).
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # NYSE session date of the execution, derived by Postgres (stored generated column).
+    entry_session_et: Mapped[date | None] = mapped_column(
+        Date, Computed(ENTRY_SESSION_ET_EXPR, persisted=True), index=True
+    )
+
+
+# Evaluator scan (created_at <= cutoff ORDER BY created_at, anti-join on id) served from the index alone.
+Index("ix_trade_execution_created_id", TradeExecution.created_at, TradeExecution.id)
 
 
 class AccountSnapshot(Base):
@@ -64,7 +94,8 @@ class PositionSnapshot(Base):
     __tablename__ = "position_snapshot"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    ticker: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    # Indexed through ix_position_snapshot_ticker_created (ticker is its leading column).
+    ticker: Mapped[str] = mapped_column(String(16), nullable=False)
     position: Mapped[float] = mapped_column(Float, nullable=False)
     avg_cost: Mapped[float | None] = mapped_column(Float, nullable=True)
     market_price: Mapped[float | None] = mapped_column(Float, nullable=True)
@@ -73,6 +104,10 @@ class PositionSnapshot(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
 
 
+# Latest snapshot per ticker (SELECT DISTINCT ON (ticker) ... ORDER BY ticker, created_at DESC).
+Index("ix_position_snapshot_ticker_created", PositionSnapshot.ticker, PositionSnapshot.created_at.desc())
+
+
 class NewsAlert(Base):
     __tablename__ = "news_alert"
 
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+# Daily/ticker outcome roll-up for dashboards: aggregates are precomputed here instead of
+# scanning trade_outcome on every read. Refreshed by the evaluator after it writes outcomes.
+_CREATE_OUTCOME_DAILY = text(
+    "CREATE MATERIALIZED VIEW IF NOT EXISTS mv_outcome_daily AS "
+    "SELECT date_trunc('day', computed_at) AS d, ticker, "
+    "avg(t3_return) AS t3_avg, avg(t7_return) AS t7_avg, "
+    "avg(t7_return - spy_t7_return) AS alpha7, count(*) AS n "
+    "FROM trade_outcome GROUP BY 1, 2"
+)
+# REFRESH ... CONCURRENTLY requires a unique index on the view.
+_CREATE_OUTCOME_DAILY_INDEX = text(
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_outcome_daily_d_ticker ON mv_outcome_daily (d, ticker)"
+)
+_REFRESH_OUTCOME_DAILY = text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_outcome_daily")
+
+
+async def create_outcome_rollup(conn: AsyncConnection) -> None:
+    await conn.execute(_CREATE_OUTCOME_DAILY)
+    await conn.execute(_CREATE_OUTCOME_DAILY_INDEX)
+
+
+async def refresh_outcome_rollup(session: AsyncSession) -> None:
+    # CONCURRENTLY: readers keep seeing the previous contents while the view is rebuilt.
+    await session.execute(_REFRESH_OUTCOME_DAILY)
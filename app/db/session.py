@@ -3,18 +3,44 @@ from __future__ import annotations
 import os
 
 from loguru import logger
-from sqlalchemy import text
+from sqlalchemy import Connection, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from app.db.models import Base
+from app.db.models import ENTRY_SESSION_ET_EXPR, Base
+from app.db.rollups import create_outcome_rollup
+
+
+# Rows per multi-VALUES statement when an executemany INSERT is batched ("insertmanyvalues").
+_INSERTMANYVALUES_PAGE_SIZE = 1000
 
 
 def build_engine() -> AsyncEngine:
     database_url = os.getenv("DATABASE_URL")
     if not database_url:
         raise RuntimeError("DATABASE_URL 未设置")
-    return create_async_engine(database_url, echo=False, pool_pre_ping=True)
+    # The async drivers (asyncpg, psycopg 3) batch executemany INSERTs through SQLAlchemy's
+    # insertmanyvalues; psycopg2's executemany_mode helpers do not apply to async engines.
+    engine = create_async_engine(
+        database_url,
+        echo=False,
+        pool_pre_ping=True,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_POOL_OVERFLOW", "20")),
+        # Recycle before server/proxy idle timeouts drop the connection under us.
+        pool_recycle=1800,
+        pool_timeout=30,
+        # Room for every distinct statement shape the app compiles (default is 500).
+        query_cache_size=1200,
+        insertmanyvalues_page_size=_INSERTMANYVALUES_PAGE_SIZE,
+    )
+    logger.debug(
+        "数据库引擎 | driver={} | insertmanyvalues={} | executemany_returning={}",
+        engine.dialect.driver,
+        engine.dialect.use_insertmanyvalues,
+        engine.dialect.insert_executemany_returning,
+    )
+    return engine
 
 
 def build_session_maker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
@@ -31,6 +57,53 @@ async def wait_for_db(engine: AsyncEngine) -> None:
         await conn.execute(text("SELECT 1"))
 
 
+# Columns added to the models after their table was first created (create_all does not alter tables).
+_ADDED_COLUMNS = (
+    "ALTER TABLE trade_execution ADD COLUMN IF NOT EXISTS entry_session_et date "
+    f"GENERATED ALWAYS AS ({ENTRY_SESSION_ET_EXPR}) STORED",
+)
+
+# sentiment_signal.risk_tags moved from jsonb to varchar(32)[]. The indexes that reference the
+# jsonb form are dropped first and recreated by _create_missing_indexes. USING cannot hold a
+# subquery, so the JSON array text is rewritten into an array literal ('["a"]' -> '{"a"}').
+_MIGRATE_RISK_TAGS_TO_ARRAY = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'sentiment_signal' AND column_name = 'risk_tags' AND data_type = 'jsonb'
+    ) THEN
+        DROP INDEX IF EXISTS ix_sentiment_signal_top1;
+        DROP INDEX IF EXISTS ix_sentiment_signal_risk_tags_gin;
+        DROP INDEX IF EXISTS ix_signal_no_risk_top;
+        ALTER TABLE sentiment_signal
+            ALTER COLUMN risk_tags DROP DEFAULT,
+            ALTER COLUMN risk_tags TYPE varchar(32)[]
+                USING translate(risk_tags::text, '[]', '{}')::varchar(32)[],
+            ALTER COLUMN risk_tags SET DEFAULT '{}';
+    END IF;
+END
+$$
+"""
+
+# Indexes dropped from the models; removed from existing databases on startup.
+_OBSOLETE_INDEXES = (
+    "ix_signal_no_risk_top",
+    "ix_sentiment_signal_risk_tags_gin",
+    # Covered by ix_position_snapshot_ticker_created.
+    "ix_position_snapshot_ticker",
+    # Covered by ix_trade_execution_created_id.
+    "ix_trade_execution_created_at",
+)
+
+
+def _create_missing_indexes(sync_conn: Connection) -> None:
+    # create_all() skips the indexes of tables that already exist; add indexes introduced later.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def init_db(engine: AsyncEngine) -> None:
     logger.info("等待数据库就绪...")
     await wait_for_db(engine)
@@ -38,3 +111,12 @@ async def init_db(engine: AsyncEngine) -> None:
     logger.info("初始化数据库表结构（create_all）")
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        for ddl in _ADDED_COLUMNS:
+            await conn.execute(text(ddl))
+        # Before the type migration: obsolete indexes may use jsonb-only expressions
+        # (jsonb_array_length) that ALTER COLUMN ... TYPE would have to rebuild and cannot.
+        for name in _OBSOLETE_INDEXES:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        await conn.execute(text(_MIGRATE_RISK_TAGS_TO_ARRAY))
+        await conn.run_sync(_create_missing_indexes)
+        await create_outcome_rollup(conn)
@@ -3,9 +3,11 @@ from __future__ import annotations
 from collections.abc import Sequence
 from datetime import datetime
 
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.broker.observer import AccountValues, PositionValues
+from app.db.batch import chunked, insert_chunk_size
 from app.db.models import AccountSnapshot, PositionSnapshot
 
 
@@ -25,18 +27,22 @@ async def insert_account_snapshot(session: AsyncSession, v: AccountValues, creat
 async def insert_position_snapshots(session: AsyncSession, items: Sequence[PositionValues], created_at: datetime) -> int:
     if not items:
         return 0
-    session.add_all(
-        [
-            PositionSnapshot(
-                ticker=i.ticker,
-                position=i.position,
-                avg_cost=i.avg_cost,
-                market_price=i.market_price,
-                market_value=i.market_value,
-                unrealized_pnl=i.unrealized_pnl,
-                created_at=created_at,
-            )
-            for i in items
-        ]
-    )
-    return len(items)
+    # Plain dicts for a Core INSERT; one snapshot row per IB position.
+    rows = [
+        {
+            "ticker": i.ticker,
+            "position": i.position,
+            "avg_cost": i.avg_cost,
+            "market_price": i.market_price,
+            "market_value": i.market_value,
+            "unrealized_pnl": i.unrealized_pnl,
+            "created_at": created_at,
+        }
+        for i in items
+    ]
+    # Count what Postgres actually wrote (RETURNING); rowcount is not reliable for executemany.
+    stmt = insert(PositionSnapshot).returning(PositionSnapshot.id)
+    inserted = 0
+    for chunk in chunked(rows, insert_chunk_size()):
+        inserted += len((await session.execute(stmt, chunk)).all())
+    return inserted
@@ -2,11 +2,22 @@ from __future__ import annotations
 
 import os
 import smtplib
+from dataclasses import dataclass
 from email.message import EmailMessage
 
 
-def send_email(*, subject: str, body_text: str) -> None:
-    """Send email via SMTP.
+@dataclass(frozen=True)
+class SmtpConfig:
+    host: str
+    port: int
+    user: str
+    password: str
+    mail_from: str
+    mail_to: str
+
+
+def load_smtp_config() -> SmtpConfig:
+    """Read SMTP settings from env.
 
     Env vars required:
     - SMTP_HOST
@@ -18,7 +29,6 @@ def send_email(*, subject: str, body_text: str) -> None:
 
     This avoids relying on system sendmail/msmtp.
     """
-
     host = os.getenv("SMTP_HOST")
     user = os.getenv("SMTP_USER")
     password = os.getenv("SMTP_PASS")
@@ -26,16 +36,63 @@ def send_email(*, subject: str, body_text: str) -> None:
     if not host or not user or not password or not mail_to:
         raise RuntimeError("SMTP_HOST/SMTP_USER/SMTP_PASS/MAIL_TO 未配置")
 
-    port = int(os.getenv("SMTP_PORT", "587"))
-    mail_from = os.getenv("MAIL_FROM", user)
+    return SmtpConfig(
+        host=host,
+        port=int(os.getenv("SMTP_PORT", "587")),
+        user=user,
+        password=password,
+        mail_from=os.getenv("MAIL_FROM", user),
+        mail_to=mail_to,
+    )
 
+
+def _build_message(cfg: SmtpConfig, *, subject: str, body_text: str) -> EmailMessage:
     msg = EmailMessage()
-    msg["From"] = mail_from
-    msg["To"] = mail_to
+    msg["From"] = cfg.mail_from
+    msg["To"] = cfg.mail_to
     msg["Subject"] = subject
     msg.set_content(body_text)
+    return msg
+
 
-    with smtplib.SMTP(host, port, timeout=30) as s:
-        s.starttls()
-        s.login(user, password)
-        s.send_message(msg)
+class SmtpNotifier:
+    """One SMTP session (connect + STARTTLS + LOGIN once) for any number of messages.
+
+    with SmtpNotifier() as n:
+        n.send(subject=..., body_text=...)
+    """
+
+    def __init__(self, cfg: SmtpConfig | None = None) -> None:
+        self._cfg = cfg or load_smtp_config()
+        self._smtp: smtplib.SMTP | None = None
+
+    def __enter__(self) -> SmtpNotifier:
+        smtp = smtplib.SMTP(self._cfg.host, self._cfg.port, timeout=30)
+        try:
+            smtp.starttls()
+            smtp.login(self._cfg.user, self._cfg.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except smtplib.SMTPException:
+            smtp.close()
+
+    def send(self, *, subject: str, body_text: str) -> None:
+        if self._smtp is None:
+            raise RuntimeError("SMTP 未连接")
+        self._smtp.send_message(_build_message(self._cfg, subject=subject, body_text=body_text))
+
+
+def send_email(*, subject: str, body_text: str) -> None:
+    """Send a single email via SMTP (see load_smtp_config for the env vars)."""
+    with SmtpNotifier() as n:
+        n.send(subject=subject, body_text=body_text)
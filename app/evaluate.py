@@ -6,16 +6,29 @@ from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
 import pandas as pd
-import pandas_market_calendars as mcal
 import yfinance as yf
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import DateTime, Integer, bindparam, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from app.cache.prices import load_closes
+from app.calendar_cache import TradingCalendar, get_trading_calendar
 from app.db.models import TradeExecution, TradeOutcome
+from app.db.rollups import refresh_outcome_rollup
 from app.db.session import build_engine, build_session_maker, init_db
 
 _ET = ZoneInfo("America/New_York")
 
+# Executions without an outcome, oldest first. Built once; run with {"cutoff": ..., "lim": ...}.
+# NOT EXISTS plans as an index-backed anti-join on trade_outcome.trade_execution_id.
+_EVAL_STMT = (
+    select(TradeExecution)
+    .where(TradeExecution.created_at <= bindparam("cutoff", type_=DateTime(timezone=True)))
+    .where(~select(TradeOutcome.id).where(TradeOutcome.trade_execution_id == TradeExecution.id).exists())
+    .order_by(TradeExecution.created_at.asc())
+    .limit(bindparam("lim", type_=Integer))
+)
+
 
 @dataclass(frozen=True)
 class OutcomePrices:
@@ -33,49 +46,66 @@ def _to_et_session_date(ts_utc: datetime) -> datetime.date:
     return ts_utc.astimezone(_ET).date()
 
 
-def _trading_sessions(start: datetime.date, end: datetime.date) -> list[datetime.date]:
-    cal = mcal.get_calendar("NYSE")
-    sched = cal.schedule(start_date=start, end_date=end)
-    return [d.date() for d in sched.index.to_pydatetime()]
-
-
-def _load_close_series(symbol: str, start: datetime.date, end: datetime.date) -> pd.Series:
-    # yfinance returns timezone-aware index; we normalize to date.
-    df = yf.download(symbol, start=str(start), end=str(end + timedelta(days=1)), progress=False, interval="1d", auto_adjust=False)
+def _load_close_map(symbols: list[str], start: datetime.date, end: datetime.date) -> dict[str, dict[datetime.date, float]]:
+    """Download daily closes for all symbols in one request; symbols without data are omitted."""
+    df = yf.download(
+        symbols,
+        start=str(start),
+        end=str(end + timedelta(days=1)),
+        progress=False,
+        interval="1d",
+        auto_adjust=False,
+        group_by="ticker",
+        threads=True,
+    )
     if df is None or df.empty:
+        # Per-symbol gaps surface as "无法获取行情" for the affected executions only.
+        return {}
+    out: dict[str, dict[datetime.date, float]] = {}
+    for symbol in symbols:
+        if symbol not in df.columns.get_level_values(0):
+            continue
+        close = df[symbol]["Close"].dropna()
+        if close.empty:
+            continue
+        # yfinance returns timezone-aware index; we normalize to date. Plain dict: O(1) lookups later.
+        out[symbol] = dict(zip(pd.to_datetime(close.index).date, close.to_numpy().tolist()))
+    return out
+
+
+def _close_series(close_map: dict[str, dict[datetime.date, float]], symbol: str) -> dict[datetime.date, float]:
+    close = close_map.get(symbol)
+    if close is None:
         raise RuntimeError(f"无法获取行情: {symbol}")
-    close = df["Close"].copy()
-    close.index = pd.to_datetime(close.index).date
     return close
 
 
-def _pick_close(close: pd.Series, session: datetime.date) -> float:
-    if session not in close.index:
+def _pick_close(close: dict[datetime.date, float], session: datetime.date) -> float:
+    v = close.get(session)
+    if v is None:
         raise RuntimeError(f"缺少收盘价数据: session={session}")
-    v = close.loc[session]
     return float(v)
 
 
-def compute_outcome_prices(entry_session: datetime.date, symbol: str) -> OutcomePrices:
-    # Need enough sessions for T+7 and some buffer.
-    sessions = _trading_sessions(entry_session - timedelta(days=7), entry_session + timedelta(days=20))
-    if entry_session not in sessions:
-        # If entry day is not a trading day, use next trading day.
-        next_sessions = [s for s in sessions if s > entry_session]
-        if not next_sessions:
-            raise RuntimeError("无法找到下一交易日")
-        entry_session = next_sessions[0]
-
-    idx = sessions.index(entry_session)
+def compute_outcome_prices(
+    entry_session: datetime.date,
+    symbol: str,
+    calendar: TradingCalendar,
+    close_map: dict[str, dict[datetime.date, float]],
+) -> OutcomePrices:
+    """`calendar` is the process-wide NYSE calendar and `close_map` the batched closes per symbol
+    (incl. SPY) for this run."""
+    # O(1) for a trading day; otherwise bisect to the next trading day.
+    idx = calendar.locate(entry_session)
+    sessions = calendar.sessions
+    if idx + 7 >= len(sessions):
+        raise RuntimeError("交易日历不足以覆盖 T+7")
+    entry_session = sessions[idx]
     t3 = sessions[idx + 3]
     t7 = sessions[idx + 7]
 
-    # Pull prices for symbol and SPY
-    start = sessions[max(0, idx - 5)]
-    end = sessions[idx + 7] + timedelta(days=2)
-
-    close_sym = _load_close_series(symbol, start, end)
-    close_spy = _load_close_series("SPY", start, end)
+    close_sym = _close_series(close_map, symbol)
+    close_spy = _close_series(close_map, "SPY")
 
     return OutcomePrices(
         entry_close=_pick_close(close_sym, entry_session),
@@ -102,25 +132,36 @@ async def _async_main() -> int:
         async with session_maker() as session:
             # Find executions without outcome and older than ~2 trading days (data likely available).
             cutoff = now_utc - timedelta(days=2)
-            stmt = (
-                select(TradeExecution)
-                .where(TradeExecution.created_at <= cutoff)
-                .where(~TradeExecution.id.in_(select(TradeOutcome.trade_execution_id)))
-                .order_by(TradeExecution.created_at.asc())
-                .limit(50)
-            )
-            executions = list((await session.execute(stmt)).scalars().all())
+            executions = list((await session.execute(_EVAL_STMT, {"cutoff": cutoff, "lim": 50})).scalars().all())
 
         if not executions:
             logger.info("没有需要评估的执行记录")
             return 0
 
-        inserted = 0
-        for ex in executions:
-            entry_session = _to_et_session_date(ex.created_at)
+        # entry_session_et is computed by Postgres; fall back to Python only for unexpected NULLs.
+        entry_sessions = [ex.entry_session_et or _to_et_session_date(ex.created_at) for ex in executions]
+        calendar = get_trading_calendar()
+
+        # One batched quote download for every ticker + SPY, 7d before the earliest entry to 22d after the latest.
+        symbols = sorted({"SPY"} | {ex.ticker for ex in executions})
+        try:
+            close_map = load_closes(
+                symbols,
+                min(entry_sessions) - timedelta(days=7),
+                max(entry_sessions) + timedelta(days=22),
+                download=_load_close_map,
+                settled_before=_to_et_session_date(now_utc),
+            )
+        except Exception:
+            logger.exception("行情下载失败 | symbols={}", symbols)
+            return 0
+
+        # Evaluate everything first, then write all outcomes in one transaction (one round-trip, one commit).
+        rows: list[dict] = []
+        for ex, entry_session in zip(executions, entry_sessions):
             try:
-                prices = compute_outcome_prices(entry_session, ex.ticker)
-                out = TradeOutcome(
+                prices = compute_outcome_prices(entry_session, ex.ticker, calendar, close_map)
+                row = dict(
                     trade_execution_id=ex.id,
                     ticker=ex.ticker,
                     entry_session=str(entry_session),
@@ -133,18 +174,36 @@ async def _async_main() -> int:
                     spy_t7_return=_ret(prices.spy_entry_close, prices.spy_t7_close),
                     computed_at=now_utc,
                 )
-
-                async with session_maker() as session:
-                    session.add(out)
-                    await session.commit()
-                inserted += 1
+                rows.append(row)
                 logger.info("评估完成 | exec_id={} | {} | t3={:.3%} (spy={:.3%}) | t7={:.3%} (spy={:.3%})",
-                            ex.id, ex.ticker, out.t3_return, out.spy_t3_return, out.t7_return, out.spy_t7_return)
+                            ex.id, ex.ticker, row["t3_return"], row["spy_t3_return"], row["t7_return"], row["spy_t7_return"])
             except Exception:
                 logger.exception("评估失败 | exec_id={} | ticker={}", ex.id, ex.ticker)
                 continue
 
+        inserted = 0
+        if rows:
+            # Core executemany (batched multi-VALUES INSERT); the unique trade_execution_id makes
+            # overlapping evaluator runs a no-op instead of an IntegrityError for the whole batch.
+            stmt = (
+                pg_insert(TradeOutcome)
+                .on_conflict_do_nothing(index_elements=[TradeOutcome.trade_execution_id])
+                .returning(TradeOutcome.trade_execution_id)
+            )
+            async with session_maker() as session:
+                result = await session.execute(stmt, rows)
+                inserted = len(result.all())
+                await session.commit()
+
         logger.info("评估写入完成 | outcomes_inserted={}", inserted)
+
+        if inserted:
+            try:
+                async with session_maker() as session:
+                    await refresh_outcome_rollup(session)
+                    await session.commit()
+            except Exception:
+                logger.exception("刷新收益汇总视图失败（不影响评估结果）")
         return 0
 
     finally:
@@ -13,16 +13,26 @@ import asyncio
 import os
 import sys
 from datetime import datetime, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
 from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from app.db.session import build_engine, build_session_maker, init_db
 
+if TYPE_CHECKING:
+    from app.collectors.rss_collector import RawNewsIn
+    from app.db.crud import InsertedRawNews
+    from app.processors.ai_analyzer import AIAnalyzer, AnalyzedItem
+
 
 def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+# Env is fixed for the run (same convention as app.broker.risk): parsed values are cached.
+@lru_cache(maxsize=None)
 def _get_bool_env(name: str, default: bool) -> bool:
     raw = os.getenv(name)
     if raw is None:
@@ -30,6 +40,7 @@ def _get_bool_env(name: str, default: bool) -> bool:
     return raw.strip().lower() in {"1", "true", "yes", "y", "on"}
 
 
+@lru_cache(maxsize=None)
 def _get_str_env(name: str, default: str) -> str:
     raw = os.getenv(name)
     return default if raw is None else raw.strip()
@@ -40,10 +51,85 @@ def _split_keywords(raw: str) -> list[str]:
     return [x for x in kws if x]
 
 
+async def _store_and_analyze(
+    session_maker: async_sessionmaker[AsyncSession],
+    raw_items: list[RawNewsIn],
+    analyzer: AIAnalyzer | None,
+) -> tuple[list[InsertedRawNews], list[AnalyzedItem]]:
+    """Commit RawNews in chunks while AI workers analyze already-committed titles.
+
+    DB writes and DeepSeek calls overlap instead of running back to back. One worker per
+    allowed concurrent batch; each queue item is one full analyzer batch (titles left over
+    from a chunk carry into the next, the remainder is flushed at the end). Output keeps input order.
+    """
+    from app.db.batch import chunked, insert_chunk_size
+    from app.db.crud import insert_raw_news
+
+    inserted: list[InsertedRawNews] = []
+    if analyzer is None:
+        # Nothing to overlap with: plain chunked inserts.
+        for chunk in chunked(raw_items, insert_chunk_size()):
+            async with session_maker() as session:
+                inserted.extend(await insert_raw_news(session, chunk))
+                await session.commit()
+        return inserted, []
+
+    queue: asyncio.Queue[tuple[int, list[str]] | None] = asyncio.Queue()
+    results: dict[int, list[AnalyzedItem]] = {}
+
+    async def worker() -> None:
+        while (job := await queue.get()) is not None:
+            seq, titles = job
+            try:
+                results[seq] = await analyzer.analyze_titles(titles)
+            except Exception:
+                logger.exception("AI 分析批次失败：跳过该批次 | batch_size={}", len(titles))
+
+    batch_size = analyzer.batch_size
+    # One committed chunk holds enough rows to give every worker a batch.
+    chunk_size = batch_size * analyzer.concurrency
+    workers = [asyncio.create_task(worker()) for _ in range(analyzer.concurrency)]
+    try:
+        seq = 0
+        pending: list[str] = []
+        for chunk in chunked(raw_items, chunk_size):
+            async with session_maker() as session:
+                rows = await insert_raw_news(session, chunk)
+                await session.commit()
+            inserted.extend(rows)
+            pending.extend(x.raw_title for x in rows if x.raw_title)
+            while len(pending) >= batch_size:
+                queue.put_nowait((seq, pending[:batch_size]))
+                del pending[:batch_size]
+                seq += 1
+        if pending:
+            queue.put_nowait((seq, pending))
+
+        for _ in workers:
+            queue.put_nowait(None)
+        await asyncio.gather(*workers)
+    finally:
+        for w in workers:
+            w.cancel()
+
+    return inserted, [a for i in sorted(results) for a in results[i]]
+
+
 async def _async_main() -> int:
+    # One engine for the whole run: every stage draws from the same warm connection pool.
+    engine = build_engine()
+    session_maker = build_session_maker(engine)
+    try:
+        return await _run_pipeline(engine, session_maker)
+    finally:
+        await engine.dispose()
+
+
+async def _run_pipeline(engine: AsyncEngine, session_maker: async_sessionmaker[AsyncSession]) -> int:
     dry_run = _get_bool_env("DRY_RUN", True)
     trading_mode = os.getenv("TRADING_MODE", "paper")
-    run_phase = _get_str_env("RUN_PHASE", "preopen")
+    # Read once; every later phase check compares against this lowercased value.
+    run_phase = _get_str_env("RUN_PHASE", "preopen").lower()
 
     logger.info(
         "AI-Quant 启动 | now_utc={} | phase={} | dry_run={} | trading_mode={}",
@@ -54,33 +140,24 @@ async def _async_main() -> int:
     )
 
     # Step 1 (P0-3): DB init.
-    engine = build_engine()
-    try:
-        await init_db(engine)
-    finally:
-        await engine.dispose()
+    await init_db(engine)
 
     # Step 1.5: Daily account/position snapshot for preopen/postclose (best effort).
-    if run_phase.lower() in {"preopen", "postclose"}:
+    if run_phase in {"preopen", "postclose"}:
         try:
-            from app.broker.executor import IBExecutor
+            from app.broker.executor import get_executor
             from app.broker.observer import fetch_account_values, fetch_positions
             from app.db.snapshots import insert_account_snapshot, insert_position_snapshots
 
             now_utc = _utc_now()
-            async with IBExecutor(dry_run=True) as ex:
-                account_v = await fetch_account_values(ex.ib)
-                positions_v = await fetch_positions(ex.ib)
+            ex = await get_executor(dry_run=True)
+            account_v = await fetch_account_values(ex.ib)
+            positions_v = await fetch_positions(ex.ib)
 
-            engine = build_engine()
-            session_maker = build_session_maker(engine)
-            try:
-                async with session_maker() as session:
-                    await insert_account_snapshot(session, account_v, created_at=now_utc)
-                    await insert_position_snapshots(session, positions_v, created_at=now_utc)
-                    await session.commit()
-            finally:
-                await engine.dispose()
+            async with session_maker() as session:
+                await insert_account_snapshot(session, account_v, created_at=now_utc)
+                await insert_position_snapshots(session, positions_v, created_at=now_utc)
+                await session.commit()
 
             logger.info("已记录账户/持仓快照 | positions={}", len(positions_v))
         except Exception:
@@ -90,13 +167,32 @@ async def _async_main() -> int:
     try:
         from app.collectors.rss_collector import RSSCollector, RSSSource
         from app.collectors.reddit_collector import RedditCollector
+        from app.collectors.seen import SeenUrls
+        from app.collectors.state import default_state_dir
 
         rss_sources = [
             RSSSource(name="yahoo_finance", url="https://finance.yahoo.com/news/rssindex"),
             RSSSource(name="cnbc_topnews", url="https://www.cnbc.com/id/100003114/device/rss/rss.html"),
         ]
-        rss_items = RSSCollector(rss_sources).fetch()
-        reddit_items = RedditCollector(subreddits=["stocks", "investing"], limit=50).fetch()
+        # Conditional-GET state is per phase: a feed seen by monitor must still be fetched in full by preopen.
+        rss_state_path = default_state_dir() / f"rss_state.{run_phase}.json"
+        # Urls already in raw_news are dropped at collection time. Monitor mode alerts on
+        # whatever is currently in the feeds, so it does not filter.
+        seen_urls = None if run_phase == "monitor" else SeenUrls.load(default_state_dir() / "seen_urls.bloom")
+        # Both collectors are network-bound and independent: run them concurrently; one failing yields [].
+        rss = RSSCollector(rss_sources, state_path=rss_state_path, seen=seen_urls)
+        rss_res, reddit_res = await asyncio.gather(
+            rss.fetch_async(),
+            RedditCollector(subreddits=["stocks", "investing"], limit=50, seen=seen_urls).fetch_async(),
+            return_exceptions=True,
+        )
+        if isinstance(rss_res, BaseException):
+            logger.opt(exception=rss_res).error("RSS 采集失败")
+            rss_res = []
+        if isinstance(reddit_res, BaseException):
+            logger.opt(exception=reddit_res).error("Reddit 采集失败")
+            reddit_res = []
+        rss_items, reddit_items = rss_res, reddit_res
         raw_items = rss_items + reddit_items
         logger.info(
             "采集完成 | rss={} | reddit={} | total={}",
@@ -106,38 +202,34 @@ async def _async_main() -> int:
         )
 
         # Monitor-only mode: keyword alerts (no AI / no trading).
-        if run_phase.lower() == "monitor":
+        if run_phase == "monitor":
             raw_kw = _get_str_env(
                 "NEWS_KEYWORDS",
                 "trump,tariff,china,fed,powell,cpi,inflation,jobs,recession,shutdown,ai,nvidia,nvda,datacenter,gpu,compute,cloud,power,grid,utilities,semiconductor",
             )
-            keywords = _split_keywords(raw_kw)
+            from app.processors.keyword_matcher import KeywordMatcher
+
+            matcher = KeywordMatcher(_split_keywords(raw_kw))
             hits: dict[str, list[tuple[str, str, str]]] = {}
             for item in raw_items:
-                title_l = item.raw_title.lower()
-                for kw in keywords:
-                    if kw and kw in title_l:
-                        hits.setdefault(kw, []).append((item.source, item.raw_title, item.url))
+                for kw in matcher.find(item.raw_title.lower()):
+                    hits.setdefault(kw, []).append((item.source, item.raw_title, item.url))
 
             if hits:
-                engine = build_engine()
-                session_maker = build_session_maker(engine)
-                now_utc = _utc_now()
-                try:
-                    from app.db.alerts import insert_news_alerts
-                    from app.news_writer import NewsHit, append_news_markdown
+                from app.db.alerts import insert_news_alerts_bulk
+                from app.news_writer import NewsHit, append_news_markdown
 
-                    flat_hits: list[NewsHit] = []
-                    async with session_maker() as session:
-                        for kw, rows in hits.items():
-                            await insert_news_alerts(session, keyword=kw, items=rows, created_at=now_utc)
-                            for (src, title, url) in rows:
-                                flat_hits.append(NewsHit(keyword=kw, source=src, title=title, url=url))
-                        await session.commit()
+                now_utc = _utc_now()
+                bulk = [(kw, src, title, url) for kw, rows in hits.items() for (src, title, url) in rows]
+                flat_hits = [NewsHit(keyword=kw, source=src, title=title, url=url) for (kw, src, title, url) in bulk]
+                # All keywords in one INSERT round-trip.
+                async with session_maker() as session:
+                    await insert_news_alerts_bulk(session, items=bulk, created_at=now_utc)
+                    await session.commit()
+                rss.save_state()
 
-                    md_path = append_news_markdown(now_utc=now_utc, hits=flat_hits)
-                finally:
-                    await engine.dispose()
+                # File append is blocking I/O; keep it off the event loop.
+                md_path = await asyncio.to_thread(append_news_markdown, now_utc=now_utc, hits=flat_hits)
 
                 logger.warning(
                     "新闻监控命中 | keywords={} | hits={} | md_path={}",
@@ -146,6 +238,7 @@ async def _async_main() -> int:
                     str(md_path) if md_path else None,
                 )
             else:
+                rss.save_state()
                 logger.info("新闻监控：未命中关键词")
 
             return 0
@@ -153,18 +246,29 @@ async def _async_main() -> int:
         logger.exception("采集阶段异常：安全退出（不交易）")
         return 0
 
-    # Step 3 (P0-6): Write RawNews (dedup by url unique).
+    # Step 3/4 (P0-6/P0-5): Write RawNews (dedup by url unique), AI-analyzing new titles as chunks commit.
+    api_key = os.getenv("DEEPSEEK_API_KEY")
     try:
-        from app.db.crud import insert_raw_news
+        analyzer = None
+        if api_key:
+            from app.processors.ai_analyzer import AIAnalyzer
 
-        engine = build_engine()
-        session_maker = build_session_maker(engine)
+            analyzer = AIAnalyzer(api_key=api_key, batch_size=15, timeout_s=25)
         try:
-            async with session_maker() as session:
-                inserted_rows = await insert_raw_news(session, raw_items)
-                await session.commit()
+            inserted_rows, analyzed = await _store_and_analyze(session_maker, raw_items, analyzer)
         finally:
-            await engine.dispose()
+            if analyzer is not None:
+                await analyzer.aclose()
+
+        # Only urls that are now committed to raw_news are remembered; a failed insert
+        # leaves the filter and the RSS validators untouched so the items are collected again next run.
+        rss.save_state()
+        if seen_urls is not None:
+            try:
+                seen_urls.add_many(i.url for i in raw_items)
+                seen_urls.save()
+            except Exception:
+                logger.exception("url 去重文件保存失败（不影响后续流程）")
 
         logger.info(
             "RawNews 入库完成 | total={} | inserted={} (url unique 去重)",
@@ -178,39 +282,44 @@ async def _async_main() -> int:
         logger.exception("RawNews 入库阶段异常：安全退出（不交易）")
         return 0
 
-    # Step 4/5 (P0-5/6): AI analyze + write SentimentSignal + select Top1.
-    api_key = os.getenv("DEEPSEEK_API_KEY")
+    # Step 5 (P0-6): write SentimentSignal + select Top1.
     if not api_key:
         logger.warning("DEEPSEEK_API_KEY 未配置：跳过 AI 分析与交易（安全）")
         return 0
 
     try:
         from app.db.crud import insert_signals, select_top1_today_no_risk
-        from app.processors.ai_analyzer import AIAnalyzer
 
         if not inserted_rows:
             logger.warning("本次没有新增 RawNews：跳过 AI 分析与交易（安全）")
             return 0
 
-        titles = [x.raw_title for x in inserted_rows if x.raw_title]
-        analyzer = AIAnalyzer(api_key=api_key, batch_size=15, timeout_s=25)
-        analyzed = analyzer.analyze_titles(titles)
+        n_titles = sum(1 for x in inserted_rows if x.raw_title)
 
         now_utc = _utc_now()
         day_start = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
 
-        engine = build_engine()
-        session_maker = build_session_maker(engine)
-        try:
-            async with session_maker() as session:
-                inserted_signals = await insert_signals(session, analyzed, created_at=now_utc)
-                await session.commit()
+        async with session_maker() as session:
+            inserted_signals = await insert_signals(session, analyzed, created_at=now_utc)
+            await session.commit()
 
-                top1 = await select_top1_today_no_risk(session, day_start_utc=day_start)
-        finally:
-            await engine.dispose()
+            top1: AnalyzedItem | None
+            if _get_bool_env("TOP1_FROM_DB", False):
+                # Also consider signals written by earlier runs today (extra day-range query).
+                from app.processors.ai_analyzer import AnalyzedItem
 
-        logger.info("AI 分析完成 | titles={} | signals_inserted={}", len(titles), inserted_signals)
+                row = await select_top1_today_no_risk(session, day_start_utc=day_start)
+                top1 = None
+                if row is not None:
+                    top1 = AnalyzedItem(
+                        ticker=row.ticker, sentiment=row.score, summary=row.ai_summary, risk_tags=list(row.risk_tags)
+                    )
+            else:
+                # Same filter as the DB query, over the signals this run just wrote (no second round-trip).
+                candidates = [a for a in analyzed if a.ticker and not a.risk_tags]
+                top1 = max(candidates, key=lambda a: a.sentiment, default=None)
+
+        logger.info("AI 分析完成 | titles={} | signals_inserted={}", n_titles, inserted_signals)
         if top1 is None:
             logger.warning("Top1 不存在（可能无 ticker 或都有风险标签）：今日不交易")
             return 0
@@ -218,9 +327,9 @@ async def _async_main() -> int:
         logger.info(
             "Top1 信号 | ticker={} | score={} | risk_tags={} | summary={}",
             top1.ticker,
-            top1.score,
+            top1.sentiment,
             top1.risk_tags,
-            top1.ai_summary,
+            top1.summary,
         )
 
     except Exception:
@@ -229,7 +338,7 @@ async def _async_main() -> int:
 
     # Step 6/7 (P0-7): IB executor
     try:
-        from app.broker.executor import IBExecutor
+        from app.broker.executor import get_executor
 
         if top1.ticker is None:
             logger.warning("Top1 ticker 为空：不交易")
@@ -239,86 +348,81 @@ async def _async_main() -> int:
         from app.db.execution import count_executions_since, insert_execution
 
         amount_usd = float(os.getenv("INVEST_AMOUNT_USD", "40"))
-        dry_run_effective = _get_bool_env("DRY_RUN", True)
+        dry_run_effective = dry_run
 
         min_sent = get_float_env("MIN_SENTIMENT_TO_TRADE", 0.3)
         max_daily_trades = get_int_env("MAX_DAILY_TRADES", 1)
 
-        if float(top1.score) < float(min_sent):
-            logger.warning("Top1 分数低于阈值：不交易 | score={} < min_sentiment={}", top1.score, min_sent)
+        if float(top1.sentiment) < float(min_sent):
+            logger.warning("Top1 分数低于阈值：不交易 | score={} < min_sentiment={}", top1.sentiment, min_sent)
             return 0
 
         now_utc = _utc_now()
         day_start = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
 
-        engine = build_engine()
-        session_maker = build_session_maker(engine)
-        try:
-            async with session_maker() as session:
-                trades_today = await count_executions_since(session, day_start)
-        finally:
-            await engine.dispose()
+        # One session (one transaction) for the daily-limit check, the snapshots and the audit row.
+        async with session_maker() as session:
+            trades_today = await count_executions_since(session, day_start)
 
-        if trades_today >= max_daily_trades:
-            logger.warning(
-                "触发 MAX_DAILY_TRADES：不交易 | trades_today={} | max_daily_trades={}",
-                trades_today,
-                max_daily_trades,
-            )
-            return 0
+            if trades_today >= max_daily_trades:
+                logger.warning(
+                    "触发 MAX_DAILY_TRADES：不交易 | trades_today={} | max_daily_trades={}",
+                    trades_today,
+                    max_daily_trades,
+                )
+                return 0
 
-        error: str | None = None
-        result = None
-        snapshot_err: str | None = None
+            error: str | None = None
+            result = None
+            snapshot_err: str | None = None
+
+            try:
+                from app.broker.observer import PriceCache
+
+                ex = await get_executor(dry_run=dry_run_effective)
+                prices = PriceCache(ex.ib)
 
-        try:
-            async with IBExecutor(dry_run=dry_run_effective) as ex:
                 # Daily monitoring: record account + positions snapshot (best effort).
                 try:
                     from app.broker.observer import fetch_account_values, fetch_positions
                     from app.db.snapshots import insert_account_snapshot, insert_position_snapshots
 
+                    # One batched quote request covers Top1 and every held position.
+                    held = [str(p.contract.symbol) for p in ex.ib.positions() if getattr(p.contract, "symbol", None)]
+                    await prices.prime([top1.ticker, *held])
+
                     account_v = await fetch_account_values(ex.ib)
-                    positions_v = await fetch_positions(ex.ib)
-
-                    engine = build_engine()
-                    session_maker = build_session_maker(engine)
-                    try:
-                        async with session_maker() as session:
-                            await insert_account_snapshot(session, account_v, created_at=now_utc)
-                            await insert_position_snapshots(session, positions_v, created_at=now_utc)
-                            await session.commit()
-                    finally:
-                        await engine.dispose()
+                    positions_v = await fetch_positions(ex.ib, prices=prices)
+
+                    # Savepoint: a failed snapshot write rolls back alone and cannot take the audit row with it.
+                    async with session.begin_nested():
+                        await insert_account_snapshot(session, account_v, created_at=now_utc)
+                        await insert_position_snapshots(session, positions_v, created_at=now_utc)
                 except Exception as e:
                     snapshot_err = str(e)
                     logger.exception("持仓/账户快照失败（不影响交易决策）")
 
-                result = await ex.buy_fractional_by_amount(top1.ticker, amount_usd=amount_usd)
+                result = await ex.buy_fractional_by_amount(
+                    top1.ticker, amount_usd=amount_usd, price=prices.get(top1.ticker)
+                )
 
-        except Exception as e:
-            error = str(e)
-            raise
-        finally:
-            # Always record an execution row for audit/kill-switch purposes.
-            engine = build_engine()
-            session_maker = build_session_maker(engine)
-            try:
-                async with session_maker() as session:
-                    await insert_execution(
-                        session,
-                        ticker=top1.ticker,
-                        amount_usd=amount_usd,
-                        price=None if result is None else result.price,
-                        qty=None if result is None else result.qty,
-                        dry_run=dry_run_effective,
-                        order_status=None if result is None else result.order_status,
-                        error=error or snapshot_err,
-                        created_at=now_utc,
-                    )
-                    await session.commit()
+            except Exception as e:
+                error = str(e)
+                raise
             finally:
-                await engine.dispose()
+                # Always record an execution row for audit/kill-switch purposes; single commit.
+                await insert_execution(
+                    session,
+                    ticker=top1.ticker,
+                    amount_usd=amount_usd,
+                    price=None if result is None else result.price,
+                    qty=None if result is None else result.qty,
+                    dry_run=dry_run_effective,
+                    order_status=None if result is None else result.order_status,
+                    error=error or snapshot_err,
+                    created_at=now_utc,
+                )
+                await session.commit()
 
         if result is None:
             logger.warning("未产生执行结果：不交易")
@@ -341,13 +445,30 @@ async def _async_main() -> int:
     return 0
 
 
+async def _run() -> int:
+    try:
+        return await _async_main()
+    finally:
+        # Close shared long-lived clients (IB connection, RSS HTTP pool) if any step opened them.
+        executor_mod = sys.modules.get("app.broker.executor")
+        if executor_mod is not None:
+            await executor_mod.shutdown_executor()
+        rss_mod = sys.modules.get("app.collectors.rss_collector")
+        if rss_mod is not None:
+            await rss_mod.aclose_http_client()
+
+
 def main() -> int:
-    return asyncio.run(_async_main())
+    return asyncio.run(_run())
 
 
 if __name__ == "__main__":
     try:
         raise SystemExit(main())
+    except asyncio.CancelledError:
+        # SIGTERM handler (app.broker.executor) cancelled the run; cleanup in _run() has completed.
+        logger.warning("收到终止信号：已退出（不交易）")
+        sys.exit(143)
     except Exception:
         logger.exception("主程序异常：安全退出（不交易）")
         sys.exit(1)
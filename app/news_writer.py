@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import os
+from collections import defaultdict
 from dataclasses import dataclass
+from operator import attrgetter
 from datetime import datetime
 from pathlib import Path
 
@@ -20,6 +22,12 @@ def _default_news_md_dir() -> Path:
     return home / ".openclaw" / "discord-qmd" / "1467563842417590416" / "1467610706932269056" / "news"
 
 
+_SOURCE_TITLE = attrgetter("source", "title")
+
+# Directories already created by this process (skips the mkdir syscall on repeated monitor runs).
+_MADE_DIRS: set[Path] = set()
+
+
 def append_news_markdown(*, now_utc: datetime, hits: list[NewsHit]) -> Path | None:
     """Append news hits to a daily markdown file.
 
@@ -29,7 +37,9 @@ def append_news_markdown(*, now_utc: datetime, hits: list[NewsHit]) -> Path | No
         return None
 
     base_dir = Path(os.getenv("NEWS_MD_DIR", str(_default_news_md_dir())))
-    base_dir.mkdir(parents=True, exist_ok=True)
+    if base_dir not in _MADE_DIRS:
+        base_dir.mkdir(parents=True, exist_ok=True)
+        _MADE_DIRS.add(base_dir)
 
     day = now_utc.date().isoformat()
     path = base_dir / f"{day}-news.md"
@@ -37,21 +47,22 @@ def append_news_markdown(*, now_utc: datetime, hits: list[NewsHit]) -> Path | No
     lines: list[str] = []
     lines.append(f"\n## {now_utc.isoformat()}Z\n")
 
-    # group by keyword
-    hits_sorted = sorted(hits, key=lambda x: (x.keyword, x.source, x.title))
-    current_kw: str | None = None
-    for h in hits_sorted:
-        if h.keyword != current_kw:
-            current_kw = h.keyword
-            lines.append(f"\n### keyword: {current_kw}\n")
-        url = h.url or ""
-        title = h.title.replace("\n", " ").strip()
-        if url:
-            lines.append(f"- [{title}]({url}) — {h.source}\n")
-        else:
-            lines.append(f"- {title} — {h.source}\n")
+    # group by keyword (one pass), then sort only within each group with a C-level key
+    by_kw: defaultdict[str, list[NewsHit]] = defaultdict(list)
+    for h in hits:
+        by_kw[h.keyword].append(h)
+    for kw, group in sorted(by_kw.items()):
+        lines.append(f"\n### keyword: {kw}\n")
+        for h in sorted(group, key=_SOURCE_TITLE):
+            url = h.url or ""
+            title = h.title.replace("\n", " ").strip()
+            if url:
+                lines.append(f"- [{title}]({url}) — {h.source}\n")
+            else:
+                lines.append(f"- {title} — {h.source}\n")
 
+    # One joined write instead of one write per line.
     with path.open("a", encoding="utf-8") as f:
-        f.writelines(lines)
+        f.write("".join(lines))
 
     return path
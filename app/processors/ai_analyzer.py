@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import os
 import re
 from dataclasses import dataclass
 
+import httpx
 from loguru import logger
-from openai import OpenAI
+from openai import AsyncOpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+try:
+    import orjson  # C JSON parser; optional
+except Exception:  # fall back to stdlib json
+    orjson = None
+
 _TICKER_RE = re.compile(r"^[A-Z]{1,6}([.-][A-Z]{1,4})?$")
+# Longest string _TICKER_RE can accept (6 + separator + 4).
+_TICKER_MAX_LEN = 11
 
 
 @dataclass(frozen=True)
@@ -29,20 +39,25 @@ def _normalize_ticker(v: object) -> str | None:
     if not isinstance(v, str):
         return None
     s = v.strip().upper()
-    if not s:
+    # Cheap C-level rejects (empty, too long, non-ASCII) before running the regex.
+    if not s or len(s) > _TICKER_MAX_LEN or not s.isascii():
         return None
     if not _TICKER_RE.match(s):
         return None
     return s
 
 
+# sentiment_signal.risk_tags is varchar(32)[].
+_MAX_RISK_TAG_LEN = 32
+
+
 def _normalize_risk_tags(v: object) -> list[str]:
-    if not isinstance(v, list):
+    if not v or not isinstance(v, list):
         return []
     out: list[str] = []
     for x in v:
         if isinstance(x, str):
-            t = x.strip()
+            t = x.strip()[:_MAX_RISK_TAG_LEN]
             if t:
                 out.append(t)
     return out
@@ -65,42 +80,70 @@ def _normalize_summary(v: object) -> str:
 
 
 class AIAnalyzer:
-    def __init__(self, api_key: str, batch_size: int = 15, timeout_s: int = 25) -> None:
+    def __init__(self, api_key: str, batch_size: int = 15, timeout_s: int = 25, concurrency: int | None = None) -> None:
         self._api_key = api_key
         self._batch_size = batch_size
         self._timeout_s = timeout_s
+        # Max batches in flight against DeepSeek (env AI_CONCURRENCY, default 4).
+        self._concurrency = max(1, concurrency or int(os.getenv("AI_CONCURRENCY", "4")))
 
+        # One keep-alive pool sized to the batch concurrency: later batches reuse TCP+TLS connections.
+        self._http = httpx.AsyncClient(
+            timeout=timeout_s,
+            limits=httpx.Limits(max_connections=self._concurrency, max_keepalive_connections=self._concurrency),
+        )
         # DeepSeek uses an OpenAI-compatible API surface.
-        self._client = OpenAI(api_key=api_key, base_url="https://api.deepseek.com", timeout=timeout_s)
+        self._client = AsyncOpenAI(
+            api_key=api_key, base_url="https://api.deepseek.com", timeout=timeout_s, http_client=self._http
+        )
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
 
-    def analyze_titles(self, titles: list[str]) -> list[AnalyzedItem]:
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def analyze_titles(self, titles: list[str]) -> list[AnalyzedItem]:
         """Analyze titles via DeepSeek.
 
         Contract:
         - Batch size: 10~20
         - Output MUST be strict JSON array; length == input length
         - If parse/length mismatch: raise (caller should skip batch)
+
+        Batches run concurrently (bounded by AI_CONCURRENCY); output keeps input order.
         """
         if not titles:
             return []
 
+        batches = [titles[i : i + self._batch_size] for i in range(0, len(titles), self._batch_size)]
+        sem = asyncio.Semaphore(self._concurrency)
+
+        async def run(batch: list[str]) -> list[AnalyzedItem]:
+            async with sem:
+                return await self._analyze_batch(batch)
+
+        results = await asyncio.gather(*[run(b) for b in batches], return_exceptions=True)
+
         out: list[AnalyzedItem] = []
-        for i in range(0, len(titles), self._batch_size):
-            batch = titles[i : i + self._batch_size]
-            try:
-                analyzed = self._analyze_batch(batch)
-                out.extend(analyzed)
-            except Exception:
-                logger.exception("AI 分析批次失败：跳过该批次 | batch_size={}", len(batch))
+        for batch, res in zip(batches, results):
+            if isinstance(res, BaseException):
+                logger.opt(exception=res).error("AI 分析批次失败：跳过该批次 | batch_size={}", len(batch))
                 # Skip the whole batch per spec.
                 continue
+            out.extend(res)
         return out
 
     @retry(wait=wait_exponential(multiplier=1, min=1, max=8), stop=stop_after_attempt(4), reraise=True)
-    def _analyze_batch(self, titles: list[str]) -> list[AnalyzedItem]:
+    async def _analyze_batch(self, titles: list[str]) -> list[AnalyzedItem]:
         prompt = self._build_prompt(titles)
 
-        resp = self._client.chat.completions.create(
+        resp = await self._client.chat.completions.create(
             model="deepseek-chat",
             messages=[
                 {"role": "system", "content": "你是严格输出JSON的金融情绪分析助手。"},
@@ -150,8 +193,8 @@ class AIAnalyzer:
         DeepSeek must return pure JSON. If it returns extra text, we treat as failure.
         """
         try:
-            data = json.loads(content)
-        except json.JSONDecodeError as e:
+            data = orjson.loads(content) if orjson is not None else json.loads(content)
+        except ValueError as e:  # json.JSONDecodeError and orjson.JSONDecodeError are both ValueError
             raise ValueError(f"DeepSeek 输出不是可解析 JSON: {e}") from e
 
         if not isinstance(data, list):
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+from typing import Any
+
+
+class KeywordMatcher:
+    """Find which keywords occur (as substrings) in a lowercased title, in one pass per title.
+
+    Uses a pyahocorasick automaton built once; without the dependency, one precompiled regex
+    alternation does the scan in C. Results follow the order of `keywords`, without duplicates.
+    """
+
+    def __init__(self, keywords: Sequence[str]) -> None:
+        # dict keeps first-seen order and doubles as keyword -> position for ordering matches.
+        self._order = {k: i for i, k in enumerate(dict.fromkeys(k for k in keywords if k))}
+        self._automaton: Any = None
+        self._pattern: re.Pattern[str] | None = None
+        self._prefixes: dict[str, list[str]] = {}
+        try:
+            import ahocorasick  # local import to avoid hard failure if dependency missing
+        except Exception:
+            self._build_regex()
+            return
+        if self._order:
+            automaton = ahocorasick.Automaton()
+            for kw in self._order:
+                automaton.add_word(kw, kw)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def _build_regex(self) -> None:
+        if not self._order:
+            return
+        # Zero-width lookahead: a match is tried at every position, so overlapping keywords are found.
+        # Longest first: the one reported at a position is the longest keyword starting there; the
+        # other keywords starting there are exactly its keyword prefixes, added via _prefixes.
+        by_len = sorted(self._order, key=len, reverse=True)
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(k) for k in by_len) + "))")
+        self._prefixes = {k: [p for p in self._order if p != k and k.startswith(p)] for k in self._order}
+
+    def find(self, title_l: str) -> list[str]:
+        if self._automaton is not None:
+            found = {kw for _, kw in self._automaton.iter(title_l)}
+        elif self._pattern is not None:
+            found = set()
+            for kw in set(self._pattern.findall(title_l)):
+                found.add(kw)
+                found.update(self._prefixes[kw])
+        else:
+            return []
+        return sorted(found, key=self._order.__getitem__)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from app.processors.keyword_matcher import KeywordMatcher
+
+KEYWORDS = ["ai", "data", "data center", "center", "china", "chain", "fed", "powell", "ai"]
+
+TITLES = [
+    "new data center capex in china",
+    "supply chain: ai chips",  # "ai" inside "chain"
+    "data data data center center",  # duplicates
+    "fed's powell on federal data",
+    "datacenter demand",  # "data" without "data center"
+    "",
+    "nothing relevant here",
+]
+
+
+def _regex_matcher(monkeypatch: pytest.MonkeyPatch) -> KeywordMatcher:
+    # A None entry in sys.modules makes `import ahocorasick` raise ImportError.
+    monkeypatch.setitem(sys.modules, "ahocorasick", None)
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher._automaton is None and matcher._pattern is not None
+    return matcher
+
+
+def _expected(title_l: str) -> list[str]:
+    return [k for k in dict.fromkeys(KEYWORDS) if k in title_l]
+
+
+@pytest.mark.parametrize("title_l", TITLES)
+def test_regex_fallback_matches_substring_semantics(monkeypatch: pytest.MonkeyPatch, title_l: str) -> None:
+    assert _regex_matcher(monkeypatch).find(title_l) == _expected(title_l)
+
+
+def test_regex_fallback_matches_automaton(monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("ahocorasick")
+    automaton = KeywordMatcher(KEYWORDS)
+    assert automaton._automaton is not None
+    regex = _regex_matcher(monkeypatch)
+    for title_l in TITLES:
+        assert regex.find(title_l) == automaton.find(title_l)
+
+
+def test_no_keywords(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert KeywordMatcher([]).find("ai") == []
+    monkeypatch.setitem(sys.modules, "ahocorasick", None)
+    assert KeywordMatcher(["", ""]).find("ai") == []
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("duckdb")
+
+from app.cache.prices import load_closes
+
+
+class FakeDownload:
+    """Weekday closes for every requested day; records each (symbols, start, end) call."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[list[str], date, date]] = []
+
+    def __call__(self, symbols: list[str], start: date, end: date) -> dict[str, dict[date, float]]:
+        self.calls.append((list(symbols), start, end))
+        out: dict[str, dict[date, float]] = {}
+        for symbol in symbols:
+            d = start
+            closes: dict[date, float] = {}
+            while d <= end:
+                if d.weekday() < 5:
+                    closes[d] = float(d.toordinal())
+                d += timedelta(days=1)
+            out[symbol] = closes
+        return out
+
+
+def _load(path, download, start: date, end: date) -> dict[str, dict[date, float]]:
+    return load_closes(["AAPL"], start, end, download=download, settled_before=date(2030, 1, 1), path=path)
+
+
+def test_head_fill_keeps_cached_range_contiguous(tmp_path) -> None:
+    path = tmp_path / "prices.duckdb"
+    dl = FakeDownload()
+
+    _load(path, dl, date(2024, 6, 1), date(2024, 7, 31))
+    _load(path, dl, date(2024, 1, 1), date(2024, 2, 29))
+    # The head fill must reach the cached head (Mon 2024-06-03), not stop at Feb.
+    assert dl.calls[-1][1:] == (date(2024, 1, 1), date(2024, 6, 3))
+
+    n_calls = len(dl.calls)
+    april = _load(path, dl, date(2024, 4, 1), date(2024, 4, 30))
+    assert len(dl.calls) == n_calls  # served from cache
+    assert len(april["AAPL"]) == 22
+    assert min(april["AAPL"]) == date(2024, 4, 1)
+    assert max(april["AAPL"]) == date(2024, 4, 30)
+
+
+def test_tail_fill_downloads_only_missing_days(tmp_path) -> None:
+    path = tmp_path / "prices.duckdb"
+    dl = FakeDownload()
+
+    _load(path, dl, date(2024, 1, 1), date(2024, 1, 31))
+    closes = _load(path, dl, date(2024, 1, 1), date(2024, 2, 29))
+
+    assert dl.calls[-1][1:] == (date(2024, 2, 1), date(2024, 2, 29))
+    assert min(closes["AAPL"]) == date(2024, 1, 1)
+    assert max(closes["AAPL"]) == date(2024, 2, 29)